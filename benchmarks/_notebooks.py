@@ -0,0 +1,192 @@
+"""Generate synthetic notebooks and file manifests for benchmarking."""
+
+from __future__ import annotations
+
+import base64
+import json
+import random
+from pathlib import Path
+
+import nbformat
+
+WORDS = [
+    "lorem",
+    "ipsum",
+    "dolor",
+    "sit",
+    "amet",
+    "consectetur",
+    "adipiscing",
+    "elit",
+    "sed",
+    "do",
+    "eiusmod",
+    "tempor",
+]
+
+
+def make_notebook(
+    n_cells=100,
+    markdown_size=200,
+    heading_density=0.5,
+    output_size=0,
+    solution_fraction=0.1,
+    seed=0,
+):
+    """Make a synthetic notebook.
+
+    Parameters
+    ----------
+    n_cells : int
+        Number of cells in the notebook.
+    markdown_size : int
+        Approximate number of characters of prose in each markdown cell.
+    heading_density : float
+        Probability that a markdown cell starts with a heading.
+    output_size : int
+        Number of bytes of (base64-encoded) image data attached to each code cell.
+    solution_fraction : float
+        Fraction of code cells tagged as *solution*.
+    seed : int
+        Seed for the random number generator.
+
+    Returns
+    -------
+    NotebookNode
+        The generated notebook. The first cell is tagged as a *toc* cell.
+    """
+    nb = nbformat.v4.new_notebook()
+    nb.cells = list(
+        iter_cells(
+            n_cells=n_cells,
+            markdown_size=markdown_size,
+            heading_density=heading_density,
+            output_size=output_size,
+            solution_fraction=solution_fraction,
+            seed=seed,
+        )
+    )
+
+    return nb
+
+
+def iter_cells(
+    n_cells=100,
+    markdown_size=200,
+    heading_density=0.5,
+    output_size=0,
+    solution_fraction=0.1,
+    nesting=0,
+    seed=0,
+):
+    """Generate the cells of a synthetic notebook, one at a time.
+
+    Takes the same parameters as `make_notebook`, and also *nesting*, the
+    depth of the nested lists and block quotes that follow the prose of
+    each markdown cell.
+    """
+    rng = random.Random(seed)
+
+    yield nbformat.v4.new_markdown_cell("", metadata={"tags": ["toc"]})
+    level = 1
+    for count in range(n_cells - 1):
+        if count % 2:
+            yield _make_code_cell(rng, output_size, solution_fraction)
+        else:
+            if rng.random() < heading_density:
+                level = max(1, min(6, level + rng.choice((-1, 0, 1))))
+            else:
+                level = 0
+            yield _make_markdown_cell(rng, markdown_size, level=level, nesting=nesting)
+            level = level or 1
+
+
+def write_notebook(filepath, **kwds):
+    """Write a synthetic notebook without holding all of it in memory.
+
+    Takes the same keywords as `iter_cells`.
+
+    Returns
+    -------
+    int
+        Size of the notebook file, in bytes.
+    """
+    metadata = json.dumps(nbformat.v4.new_notebook().metadata)
+    with open(filepath, "w") as fp:
+        fp.write('{\n "cells": [\n')
+        for count, cell in enumerate(iter_cells(**kwds)):
+            if count:
+                fp.write(",\n")
+            json.dump(cell, fp)
+        fp.write(
+            f'\n ],\n "metadata": {metadata},'
+            f' "nbformat": 4, "nbformat_minor": {nbformat.v4.nbformat_minor}\n}}\n'
+        )
+        return fp.tell()
+
+
+def make_paths(n_paths, seed=0):
+    """Make a list of synthetic, and mostly well-formed, file paths."""
+    rng = random.Random(seed)
+
+    paths = []
+    for _ in range(n_paths):
+        parts = [rng.choice(WORDS) for _ in range(rng.randint(1, 4))]
+        stem = rng.choice(("-", "_", " ", "")).join(
+            rng.choice(WORDS) for _ in range(rng.randint(1, 3))
+        )
+        if rng.random() < 0.05:
+            stem = stem.title()
+        paths.append("/".join(parts + [stem + ".ipynb"]))
+
+    return paths
+
+
+def write_corpus(path, n_notebooks, **kwds):
+    """Write a directory of synthetic notebooks."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    filepaths = []
+    for count in range(n_notebooks):
+        filepath = path / f"notebook_{count:06d}.ipynb"
+        if not filepath.exists():
+            nbformat.write(make_notebook(seed=count, **kwds), filepath)
+        filepaths.append(filepath)
+
+    return filepaths
+
+
+def _make_markdown_cell(rng, size, level=0, nesting=0):
+    lines = []
+    if level:
+        lines.append(f"{'#' * level} {' '.join(rng.sample(WORDS, 3)).title()}")
+        lines.append("")
+
+    prose = []
+    while sum(len(word) + 1 for word in prose) < size:
+        prose.append(rng.choice(WORDS))
+    lines.append(" ".join(prose))
+
+    if nesting:
+        lines.append("")
+        lines += [f"{'  ' * depth}- {rng.choice(WORDS)}" for depth in range(nesting)]
+        lines.append("")
+        lines.append(f"{'> ' * nesting}{' '.join(rng.sample(WORDS, 3))}")
+
+    return nbformat.v4.new_markdown_cell("\n".join(lines))
+
+
+def _make_code_cell(rng, output_size, solution_fraction):
+    tags = ["solution"] if rng.random() < solution_fraction else []
+    cell = nbformat.v4.new_code_cell(
+        f"x = {rng.randint(0, 100)}\nprint(x)", metadata={"tags": tags}
+    )
+    if output_size:
+        payload = base64.b64encode(rng.randbytes(output_size * 3 // 4)).decode()
+        cell.outputs = [
+            nbformat.v4.new_output(
+                "display_data", data={"image/png": payload, "text/plain": "<Figure>"}
+            )
+        ]
+    return cell
@@ -0,0 +1,282 @@
+"""Time the hooks on synthetic and real notebook corpora.
+
+Results are written as JSON so that runs from different commits can be
+compared, for example::
+
+    $ nox -s bench
+    $ nox -s bench -- --compare build/benchmarks/<other-commit>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import nbformat
+from _notebooks import make_notebook
+from _notebooks import make_paths
+from _notebooks import write_corpus
+from click.testing import CliRunner
+
+from heartfelt_hooks._version import __version__
+from heartfelt_hooks.check_heading_levels import DedentValidator
+from heartfelt_hooks.check_heading_levels import IndentValidator
+from heartfelt_hooks.check_heading_levels import NotebookHeadings
+from heartfelt_hooks.check_heading_levels import OneAndOnlyOneLevelOneValidator
+from heartfelt_hooks.check_heading_levels import StartsWithLevelOneValidator
+from heartfelt_hooks.check_heading_levels import validate_filepath
+from heartfelt_hooks.check_mixed_case import check_mixed_case
+from heartfelt_hooks.check_snake_case import check_snake_case
+from heartfelt_hooks.check_whitespace import check_whitespace
+from heartfelt_hooks.hide_solution_cells import _hide_cells
+from heartfelt_hooks.list_headings import _insert_toc
+
+VALIDATORS = (
+    IndentValidator,
+    DedentValidator,
+    StartsWithLevelOneValidator,
+    OneAndOnlyOneLevelOneValidator,
+)
+
+FILENAME_CHECKS = {
+    "check_whitespace": check_whitespace,
+    "check_mixed_case": check_mixed_case,
+    "check_snake_case": check_snake_case,
+}
+
+NOTEBOOK_SIZES = {
+    "small": {"n_cells": 20, "markdown_size": 200, "heading_density": 0.5},
+    "large": {"n_cells": 2000, "markdown_size": 500, "heading_density": 0.5},
+    "dense": {"n_cells": 2000, "markdown_size": 50, "heading_density": 1.0},
+    "outputs": {"n_cells": 200, "markdown_size": 200, "output_size": 100_000},
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output", type=Path, help="Where to write the results (JSON)."
+    )
+    parser.add_argument(
+        "--compare", type=Path, help="Compare against a previous results file."
+    )
+    parser.add_argument(
+        "--corpus", type=Path, help="A directory of real notebooks to also time."
+    )
+    parser.add_argument(
+        "--file-counts",
+        type=_int_list,
+        default=[1, 10, 100, 1_000, 10_000, 100_000],
+        help="Comma-separated number of files for the filename checks.",
+    )
+    parser.add_argument(
+        "--notebook-counts",
+        type=_int_list,
+        default=[1, 10, 100],
+        help="Comma-separated number of notebooks to validate.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timings per benchmark.")
+    parser.add_argument(
+        "--work-dir", type=Path, help="Where to write generated notebooks."
+    )
+    args = parser.parse_args(argv)
+
+    commit = _git_commit()
+    output = args.output or Path("build", "benchmarks", f"{commit}.json")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = args.work_dir or Path(tmp)
+
+        results = []
+        results += bench_notebooks(repeat=args.repeat)
+        results += bench_validate(work_dir, args.notebook_counts, repeat=args.repeat)
+        results += bench_filenames(work_dir, args.file_counts, repeat=args.repeat)
+        if args.corpus:
+            results += bench_corpus(args.corpus, repeat=args.repeat)
+
+    report = {
+        "commit": commit,
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
+
+
+def bench_notebooks(repeat=3):
+    """Time the per-notebook functions on notebooks of different shapes."""
+    results = []
+    for name, params in NOTEBOOK_SIZES.items():
+        nb = make_notebook(**params)
+
+        results.append(
+            _measure(
+                "NotebookHeadings.extract",
+                {"notebook": name, **params},
+                lambda nb=nb: NotebookHeadings.extract(nb, cells_to_ignore=["toc"]),
+                repeat=repeat,
+            )
+        )
+
+        toc = NotebookHeadings.extract(nb, cells_to_ignore=["toc"])
+        toc = os.linesep.join(f"* {heading.text}" for _, heading in toc)
+        results.append(
+            _measure(
+                "_insert_toc",
+                {"notebook": name, **params},
+                lambda nb=nb, toc=toc: _insert_toc(nb.cells, toc),
+                setup=lambda nb=nb: copy.deepcopy(nb),
+                repeat=repeat,
+            )
+        )
+
+        results.append(
+            _measure(
+                "_hide_cells",
+                {"notebook": name, **params},
+                lambda nb: _hide_cells(nb.cells, tags_to_hide={"solution"}),
+                setup=lambda nb=nb: copy.deepcopy(nb),
+                repeat=repeat,
+            )
+        )
+    return results
+
+
+def bench_validate(work_dir, counts, repeat=3):
+    """Time validating increasing numbers of notebook files."""
+    filepaths = write_corpus(Path(work_dir) / "notebooks", max(counts, default=0))
+
+    results = []
+    for count in counts:
+        results.append(
+            _measure(
+                "validate_filepath",
+                {"files": count},
+                lambda count=count: [
+                    validate_filepath(filepath, validators=VALIDATORS)
+                    for filepath in filepaths[:count]
+                ],
+                repeat=repeat,
+            )
+        )
+    return results
+
+
+def bench_filenames(work_dir, counts, repeat=3):
+    """Time the filename checks on manifests of increasing length."""
+    runner = CliRunner()
+
+    results = []
+    for count in counts:
+        manifest = Path(work_dir) / f"manifest_{count}.txt"
+        manifest.write_text(os.linesep.join(make_paths(count)))
+
+        for name, command in FILENAME_CHECKS.items():
+            result = _measure(
+                name,
+                {"files": count},
+                lambda command=command, manifest=manifest: runner.invoke(
+                    command, ["--silent", "--file", str(manifest)]
+                ),
+                repeat=repeat,
+            )
+            result["per_path"] = result["min"] / count
+            print(f"{result['per_path'] * 1e6:10.3f}us per path", file=sys.stderr)
+
+            results.append(result)
+    return results
+
+
+def bench_corpus(path, repeat=3):
+    """Time the notebook functions on a directory of real notebooks."""
+    filepaths = sorted(Path(path).rglob("*.ipynb"))
+    notebooks = [nbformat.read(filepath, as_version=4) for filepath in filepaths]
+
+    return [
+        _measure(
+            "validate_filepath",
+            {"corpus": str(path), "files": len(filepaths)},
+            lambda: [
+                validate_filepath(filepath, validators=VALIDATORS)
+                for filepath in filepaths
+            ],
+            repeat=repeat,
+        ),
+        _measure(
+            "NotebookHeadings.extract",
+            {"corpus": str(path), "files": len(filepaths)},
+            lambda: [NotebookHeadings.extract(nb) for nb in notebooks],
+            repeat=repeat,
+        ),
+    ]
+
+
+def compare(before, after):
+    """Print the change in timings between two reports."""
+    baseline = {_key(result): result["min"] for result in before["results"]}
+
+    print(f"{before['commit']} -> {after['commit']}")
+    for result in after["results"]:
+        key = _key(result)
+        if key in baseline and baseline[key] > 0:
+            ratio = result["min"] / baseline[key]
+            print(f"{ratio:7.2f}x  {result['name']} {json.dumps(result['params'])}")
+
+
+def _measure(name, params, func, setup=None, repeat=3):
+    seconds = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        seconds.append(time.perf_counter() - start)
+
+    print(f"{min(seconds):10.6f}s  {name} {json.dumps(params)}", file=sys.stderr)
+
+    return {
+        "name": name,
+        "params": params,
+        "seconds": seconds,
+        "min": min(seconds),
+        "median": statistics.median(seconds),
+    }
+
+
+def _key(result):
+    return result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _int_list(value):
+    return [int(item) for item in value.split(",") if item]
+
+
+if __name__ == "__main__":
+    main()
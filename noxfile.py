@@ -38,6 +38,26 @@ def test_cli(session: nox.Session) -> None:
         session.run(command)
 
 
+@nox.session
+def bench(session: nox.Session) -> None:
+    """Time the hooks and write the results as JSON."""
+    session.install(".")
+
+    session.run("python", "benchmarks/run_benchmarks.py", *session.posargs)
+
+
+@nox.session
+def stress(session: nox.Session) -> None:
+    """Check runtime and peak memory on pathological inputs.
+
+    Pass ``-- --scale 0.1`` to run on inputs a tenth of the full size.
+    """
+    session.install("pytest")
+    session.install(".")
+
+    session.run("pytest", "stress", *session.posargs)
+
+
 @nox.session
 def lint(session: nox.Session) -> None:
     """Look for lint."""
@@ -0,0 +1,19 @@
+"""Linters and pre-commit hooks for notebooks and filenames."""
+
+import time
+
+# when the hooks started to be imported, for the import row of --profile
+_IMPORT_STARTED = time.perf_counter()
+
+from heartfelt_hooks._version import __version__  # noqa: E402
+
+__all__ = ["__version__", "check", "CheckResult", "HeadingError"]
+
+
+def __getattr__(name):
+    # the api is imported lazily so that the hooks don't pay for it at startup
+    if name in ("check", "CheckResult", "HeadingError"):
+        from heartfelt_hooks import _api
+
+        return getattr(_api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
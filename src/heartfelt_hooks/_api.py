@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import nbformat
+
+from heartfelt_hooks._plugins import BUILTIN_VALIDATORS
+from heartfelt_hooks._plugins import load_validators
+from heartfelt_hooks._plugins import needs_of
+from heartfelt_hooks._readers import read_notebook
+from heartfelt_hooks._readers import read_source
+from heartfelt_hooks.check_heading_levels import HeadingError
+from heartfelt_hooks.check_heading_levels import NotebookHeadings
+
+
+@dataclass(frozen=True, slots=True)
+class CheckResult:
+    """The result of checking a notebook.
+
+    Attributes
+    ----------
+    source : str
+        Path to the notebook or, for an in-memory notebook, its position
+        in the list of notebooks that were checked (``"<notebook 0>"``).
+    errors : tuple of HeadingError
+        Headings that break a rule.
+    """
+
+    source: str
+    errors: tuple[HeadingError, ...] = ()
+
+    @property
+    def ok(self):
+        """``True`` if no rules were broken."""
+        return not self.errors
+
+
+def check(notebooks, rules=None, jobs=1):
+    """Check the headings of notebooks.
+
+    Parameters
+    ----------
+    notebooks : path, bytes, dict, or iterable of those
+        Notebooks to check, given either as paths to notebook files,
+        the contents of notebook files, or already-parsed notebooks. Files
+        in other formats, such as jupytext scripts, are read based on their
+        suffix; contents are always read as ``.ipynb`` files.
+    rules : iterable of str, optional
+        Names of the rules to check (``"indent"``, ``"dedent"``, ``"first"``,
+        ``"level-one"``, or a rule from a validator plugin). The default is
+        to check the four built-in rules.
+    jobs : int, optional
+        Number of processes to check notebooks with (0 means one per cpu).
+
+    Returns
+    -------
+    list of CheckResult
+        The result for each notebook, in the order given.
+
+    Examples
+    --------
+    >>> import heartfelt_hooks
+    >>> nb = {
+    ...     "nbformat": 4,
+    ...     "nbformat_minor": 5,
+    ...     "metadata": {},
+    ...     "cells": [
+    ...         {"cell_type": "markdown", "metadata": {}, "source": "# Title"},
+    ...         {"cell_type": "markdown", "metadata": {}, "source": "### Too deep"},
+    ...     ],
+    ... }
+    >>> [result] = heartfelt_hooks.check(nb, rules=["indent"])
+    >>> result.ok
+    False
+    >>> error = result.errors[0]
+    >>> error.rule, error.cell, error.text
+    ('indent', 1, 'Too deep')
+    """
+    if isinstance(notebooks, (str, bytes, dict, os.PathLike)):
+        notebooks = [notebooks]
+
+    validators = load_validators(BUILTIN_VALIDATORS if rules is None else rules)
+
+    items = [(_name(nb, count), nb, validators) for count, nb in enumerate(notebooks)]
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(items) < 2:
+        return [_check_one(item) for item in items]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(items) // (4 * jobs))
+            return list(pool.map(_check_one, items, chunksize=chunksize))
+
+
+def _check_one(item):
+    name, notebook, validators = item
+    needs = needs_of(validators)
+
+    if isinstance(notebook, dict):
+        nb = nbformat.from_dict(notebook)
+    elif isinstance(notebook, bytes):
+        nb = read_notebook(notebook, needs=needs)
+    else:
+        nb = read_source(Path(notebook).read_bytes(), filepath=notebook, needs=needs)
+
+    headings = NotebookHeadings.extract(nb) if "headings" in needs else None
+
+    errors = []
+    for cls in validators:
+        validator = cls(name, headings=headings, nb=nb)
+        validator.validate()
+        errors += validator.errors()
+
+    return CheckResult(source=name, errors=tuple(errors))
+
+
+def _name(notebook, count):
+    if isinstance(notebook, (bytes, dict)):
+        return f"<notebook {count}>"
+    else:
+        return os.fspath(notebook)
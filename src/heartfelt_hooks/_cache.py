@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import mmap
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import time
+from importlib.metadata import version
+from pathlib import Path
+
+import rich_click as click
+
+from heartfelt_hooks._git import git_path
+from heartfelt_hooks._version import __version__
+
+cache_option = click.option(
+    "--cache/--no-cache",
+    default=True,
+    envvar="HEARTFELT_CACHE",
+    help=(
+        "Share parsed notebooks with the other hooks, and later runs, through a"
+        " store in the .git directory."
+    ),
+)
+
+FORMAT_VERSION = 1
+"""Version of the binary format of parsed notebooks."""
+
+MAX_AGE = 30 * 24 * 60 * 60
+"""Seconds after which parsed notebooks that haven't been used are pruned."""
+
+PRUNE_INTERVAL = 24 * 60 * 60
+"""Seconds between prunings of a store."""
+
+CELL_TYPES = ("code", "markdown", "raw")
+
+_MAGIC = b"HHnb"
+_NONE = 0xFFFFFFFF
+
+# magic, version, then the number of cells, tag references, headings and strings.
+_HEADER = struct.Struct("<4sBIIII")
+# cell type, string index of the (markdown) source, number of tags, first tag.
+_CELL = struct.Struct("<BIHI")
+_TAG = struct.Struct("<I")
+# cell index, level, string index of the text.
+_HEADING = struct.Struct("<IBI")
+# offset and length of a string.
+_STRING = struct.Struct("<II")
+
+
+class ParsedNotebook:
+    """What the notebook hooks use from a notebook, in a compact binary form.
+
+    A parsed notebook holds the type and tags of each cell, the source of
+    each markdown cell, and the headings in them. It is stored as a header
+    followed by tables of fixed-size records that refer to a block of
+    utf-8 encoded strings, so that it can be read from a memory-mapped
+    file without deserializing strings that aren't used.
+
+    Parameters
+    ----------
+    buffer : bytes-like
+        The serialized notebook.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._cache import ParsedNotebook
+    >>> nb = {
+    ...     "cells": [
+    ...         {"cell_type": "markdown", "metadata": {"tags": ["toc"]}, "source": ""},
+    ...         {"cell_type": "code", "metadata": {}, "source": "x = 1"},
+    ...         {"cell_type": "markdown", "metadata": {}, "source": "# Title"},
+    ...     ]
+    ... }
+    >>> parsed = ParsedNotebook.from_notebook(nb, [(2, 1, "Title")])
+    >>> parsed = ParsedNotebook(parsed.to_bytes())
+    >>> parsed.cell_types
+    ('markdown', 'code', 'markdown')
+    >>> parsed.tags
+    (('toc',), (), ())
+    >>> parsed.source(2)
+    '# Title'
+    >>> parsed.headings(cells_to_ignore=["toc"])
+    [(2, 1, 'Title')]
+    """
+
+    def __init__(self, buffer):
+        self._buffer = memoryview(buffer)
+
+        magic, version, n_cells, n_tags, n_headings, n_strings = _HEADER.unpack_from(
+            self._buffer
+        )
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            raise ValueError("not a parsed notebook, or an old version of one")
+
+        offset = _HEADER.size
+        cells, offset = _unpack_table(self._buffer, offset, _CELL, n_cells)
+        tags, offset = _unpack_table(self._buffer, offset, _TAG, n_tags)
+        headings, offset = _unpack_table(self._buffer, offset, _HEADING, n_headings)
+        self._strings, offset = _unpack_table(self._buffer, offset, _STRING, n_strings)
+        self._strings_offset = offset
+
+        self._cells = cells
+        self.cell_types = tuple(CELL_TYPES[cell_type] for cell_type, *_ in cells)
+        self.tags = tuple(
+            tuple(self._string(tags[first + n][0]) for n in range(n_cell_tags))
+            for _, _, n_cell_tags, first in cells
+        )
+        self._headings = [
+            (cell, level, self._string(text)) for cell, level, text in headings
+        ]
+
+    def source(self, cell):
+        """The source of a markdown cell, or ``None`` for other cells."""
+        index = self._cells[cell][1]
+        return None if index == _NONE else self._string(index)
+
+    def headings(self, cells_to_ignore=None):
+        """The headings of the notebook.
+
+        Parameters
+        ----------
+        cells_to_ignore : iterable of str, optional
+            Skip the headings of cells tagged with any of these tags.
+
+        Returns
+        -------
+        list of tuple of (int, int, str)
+            The cell, level and text of each heading.
+        """
+        if not cells_to_ignore:
+            return list(self._headings)
+
+        cells_to_ignore = set(cells_to_ignore)
+        return [
+            heading
+            for heading in self._headings
+            if cells_to_ignore.isdisjoint(self.tags[heading[0]])
+        ]
+
+    def to_bytes(self):
+        """Serialize the notebook."""
+        return bytes(self._buffer)
+
+    @classmethod
+    def from_notebook(cls, nb, headings):
+        """Make a parsed notebook.
+
+        Parameters
+        ----------
+        nb : NotebookNode or dict
+            The notebook, with the source of each cell as a string.
+        headings : iterable of tuple of (int, int, str)
+            The cell, level and text of every heading in the notebook.
+        """
+        strings = _StringTable()
+
+        cells, tags = [], []
+        for cell in nb["cells"]:
+            cell_tags = cell.get("metadata", {}).get("tags", [])
+            source = (
+                strings.add(cell["source"])
+                if cell["cell_type"] == "markdown"
+                else _NONE
+            )
+            cells.append(
+                (
+                    CELL_TYPES.index(cell["cell_type"]),
+                    source,
+                    len(cell_tags),
+                    len(tags),
+                )
+            )
+            tags += [(strings.add(tag),) for tag in cell_tags]
+
+        headings = [(cell, level, strings.add(text)) for cell, level, text in headings]
+
+        header = _HEADER.pack(
+            _MAGIC, FORMAT_VERSION, len(cells), len(tags), len(headings), len(strings)
+        )
+        return cls(
+            b"".join(
+                [
+                    header,
+                    _pack_table(_CELL, cells),
+                    _pack_table(_TAG, tags),
+                    _pack_table(_HEADING, headings),
+                    _pack_table(_STRING, strings.index),
+                    strings.data(),
+                ]
+            )
+        )
+
+    def _string(self, index):
+        offset, length = self._strings[index]
+        start = self._strings_offset + offset
+        end = start + length
+        return str(self._buffer[start:end], "utf-8")
+
+
+class ParseStore:
+    """A store of parsed notebooks, keyed by the hash of their contents.
+
+    Notebooks are kept one per file, and memory-mapped when read, so
+    that the hooks of a single pre-commit run (and later runs) parse each
+    notebook only once. As the headings of a notebook depend on the code
+    that extracts them, each version of heartfelt-hooks, and of mistletoe,
+    keeps its notebooks apart from the others.
+
+    Parameters
+    ----------
+    path : path
+        Where to keep the store.
+    """
+
+    def __init__(self, path):
+        self._root = Path(path) / f"parsed-v{FORMAT_VERSION}"
+        self._path = self._root / _generation()
+
+    @classmethod
+    def open(cls, path=None):
+        """Open the store of a repository.
+
+        Parameters
+        ----------
+        path : path, optional
+            Where to keep the store. The default is inside the repository's
+            ``.git`` directory, so that it is shared between hooks, and runs.
+
+        Returns
+        -------
+        ParseStore or None
+            The store, or ``None`` if not within a git repository.
+        """
+        if path is None:
+            try:
+                path = git_path("heartfelt-hooks")
+            except (OSError, subprocess.CalledProcessError):
+                return None
+
+        store = cls(path)
+        store.prune(interval=PRUNE_INTERVAL)
+        return store
+
+    def __contains__(self, key):
+        return self._filepath(key).is_file()
+
+    def get(self, key):
+        """Get a parsed notebook, or ``None`` if it is not in the store."""
+        filepath = self._filepath(key)
+        try:
+            with open(filepath, "rb") as fp:
+                buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            parsed = ParsedNotebook(buffer)
+        except (OSError, ValueError, struct.error):
+            return None
+
+        # mark as used, so that it isn't pruned
+        with contextlib.suppress(OSError):
+            os.utime(filepath)
+        return parsed
+
+    def put(self, key, parsed):
+        """Add a parsed notebook to the store."""
+        filepath = self._filepath(key)
+        with contextlib.suppress(OSError):
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "wb", dir=filepath.parent, delete=False
+            ) as fp:
+                fp.write(parsed.to_bytes())
+            os.replace(fp.name, filepath)
+
+    def prune(self, max_age=MAX_AGE, interval=0):
+        """Remove the notebooks of other versions, and those not used lately.
+
+        Parameters
+        ----------
+        max_age : float, optional
+            Remove notebooks that haven't been used for this many seconds.
+        interval : float, optional
+            Do nothing if the store was pruned less than this many seconds
+            ago.
+        """
+        now = time.time()
+        marker = self._root / "pruned"
+        with contextlib.suppress(OSError):
+            if now - marker.stat().st_mtime < interval:
+                return
+
+        with contextlib.suppress(OSError):
+            self._root.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+            for generation in self._root.iterdir():
+                if generation.is_dir() and generation != self._path:
+                    shutil.rmtree(generation, ignore_errors=True)
+            for filepath in self._path.glob("*/*"):
+                with contextlib.suppress(OSError):
+                    if now - filepath.stat().st_mtime > max_age:
+                        filepath.unlink()
+
+    def _filepath(self, key):
+        return self._path / key[:2] / key
+
+
+@functools.lru_cache(maxsize=None)
+def _generation():
+    return f"{__version__}-mistletoe-{version('mistletoe')}"
+
+
+class _StringTable:
+    def __init__(self):
+        self._strings = {}
+        self._data = []
+        self._offset = 0
+        self.index = []
+
+    def __len__(self):
+        return len(self.index)
+
+    def add(self, string):
+        if (index := self._strings.get(string)) is None:
+            data = string.encode("utf-8")
+            index = self._strings[string] = len(self.index)
+            self.index.append((self._offset, len(data)))
+            self._data.append(data)
+            self._offset += len(data)
+        return index
+
+    def data(self):
+        return b"".join(self._data)
+
+
+def _pack_table(record, rows):
+    return b"".join(record.pack(*row) for row in rows)
+
+
+def _unpack_table(buffer, offset, record, n_rows):
+    end = offset + record.size * n_rows
+    return list(record.iter_unpack(buffer[offset:end])), end
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import functools
+import sys
+from pathlib import Path
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+
+def find_pyproject(path="."):
+    """Find the nearest ``pyproject.toml``, looking up from *path*."""
+    path = Path(path).absolute()
+    for parent in (path, *path.parents):
+        if (candidate := parent / "pyproject.toml").is_file():
+            return candidate
+    return None
+
+
+def load_config(path=None):
+    """Read the ``[tool.heartfelt-hooks]`` section of a ``pyproject.toml``.
+
+    Parameters
+    ----------
+    path : path, optional
+        Path to a ``pyproject.toml``. The default is the nearest one to
+        the current directory, which is only looked for once per directory.
+
+    Returns
+    -------
+    dict
+        The section, or an empty dict if there isn't one. Any
+        ``plugin-paths`` are made absolute.
+    """
+    if path is None and (path := _find_pyproject(Path.cwd())) is None:
+        return {}
+    return _load_config(Path(path).absolute())
+
+
+@functools.lru_cache(maxsize=None)
+def _find_pyproject(path):
+    return find_pyproject(path)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config(path):
+    with open(path, "rb") as fp:
+        config = tomllib.load(fp).get("tool", {}).get("heartfelt-hooks", {})
+
+    if "plugin-paths" in config:
+        config["plugin-paths"] = [
+            str(path.parent / plugin_path) for plugin_path in config["plugin-paths"]
+        ]
+
+    return config
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import rich_click as click
+
+
+def fail_fast_options(func):
+    """Add the ``--fail-fast`` and ``--max-errors`` options to a command."""
+    func = click.option(
+        "--max-errors",
+        type=click.IntRange(min=1),
+        envvar="HEARTFELT_MAX_ERRORS",
+        help="Stop once this many errors have been found.",
+    )(func)
+    return click.option(
+        "--fail-fast/--no-fail-fast",
+        default=False,
+        envvar="HEARTFELT_FAIL_FAST",
+        help="Stop at the first error, without checking the remaining files.",
+    )(func)
+
+
+class ErrorLimit:
+    """Tell when enough errors have been found to stop.
+
+    Parameters
+    ----------
+    max_errors : int, optional
+        Number of errors to stop after. If ``None``, never stop early.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._fail_fast import ErrorLimit
+    >>> limit = ErrorLimit(max_errors=3)
+    >>> limit.remaining(1), limit.reached(1)
+    (2, False)
+    >>> limit.remaining(4), limit.reached(4)
+    (0, True)
+    >>> ErrorLimit().remaining(100) is None
+    True
+    """
+
+    def __init__(self, max_errors=None):
+        self.max_errors = max_errors
+
+    @classmethod
+    def from_options(cls, fail_fast=False, max_errors=None):
+        """Create a limit from the ``--fail-fast`` and ``--max-errors`` options."""
+        return cls(max_errors=1 if fail_fast else max_errors)
+
+    def remaining(self, error_count):
+        """Number of errors still to report, or ``None`` if there is no limit."""
+        if self.max_errors is None:
+            return None
+        return max(self.max_errors - error_count, 0)
+
+    def reached(self, error_count):
+        """Whether *error_count* errors are enough to stop."""
+        return self.max_errors is not None and error_count >= self.max_errors
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+import threading
+from pathlib import Path
+
+import rich_click as click
+
+staged_option = click.option(
+    "--staged",
+    is_flag=True,
+    help=(
+        "Check the versions of files in the git index rather than the working"
+        " tree. Without FILES, check all staged files."
+    ),
+)
+
+
+def git(*args):
+    """Run a git command and return its output."""
+    return subprocess.run(
+        ["git", *args],
+        capture_output=True,
+        check=True,
+        env={**os.environ, "GIT_LITERAL_PATHSPECS": "1"},
+    ).stdout
+
+
+def blob_sha(contents):
+    """The object name git gives a file's contents, without running git.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._git import blob_sha
+    >>> blob_sha("hello")
+    'b6fc4c620b67d95f953a5c1c1230aaab5db5a1b0'
+    """
+    if isinstance(contents, str):
+        contents = contents.encode("utf-8")
+    sha = hashlib.sha1(b"blob %d\0" % len(contents))
+    sha.update(contents)
+    return sha.hexdigest()
+
+
+def git_path(path):
+    """Path to a file within the repository's ``.git`` directory."""
+    return os.fsdecode(git("rev-parse", "--git-path", path).strip())
+
+
+def toplevel():
+    """Path to the top of the working tree."""
+    return os.fsdecode(git("rev-parse", "--show-toplevel").strip())
+
+
+def staged_files(suffixes=None):
+    """Paths of the files added, copied, modified or renamed in the index.
+
+    Paths are relative to the current directory, which may be below the
+    top of the working tree.
+
+    Parameters
+    ----------
+    suffixes : iterable of str, optional
+        Only include files with one of these (lower case) suffixes.
+    """
+    output = git("diff", "--cached", "--name-only", "-z", "--diff-filter=ACMR")
+    top = toplevel()
+    paths = (
+        os.path.relpath(os.path.join(top, os.fsdecode(path)))
+        for path in output.split(b"\0")
+        if path
+    )
+    if suffixes is not None:
+        suffixes = set(suffixes)
+        paths = (path for path in paths if Path(path).suffix.lower() in suffixes)
+    return tuple(paths)
+
+
+def index_entries(filepaths=None):
+    """Object names of files in the index.
+
+    Parameters
+    ----------
+    filepaths : iterable of str, optional
+        Only include these files. Otherwise, include every file in the index.
+
+    Returns
+    -------
+    dict of str to str
+        The object name (sha) of the staged version of each file, by its
+        path relative to the current directory.
+    """
+    wanted = None if filepaths is None else {os.path.normpath(f) for f in filepaths}
+
+    entries = {}
+    for line in git("ls-files", "--stage", "-z", "--", toplevel()).split(b"\0"):
+        if not line:
+            continue
+        info, _, path = line.partition(b"\t")
+        path = os.path.normpath(os.fsdecode(path))
+        if wanted is None or path in wanted:
+            entries[path] = info.split()[1].decode()
+
+    return entries
+
+
+def cat_blobs(shas):
+    """Read the contents of blobs with a single ``git cat-file`` process.
+
+    Parameters
+    ----------
+    shas : list of str
+        Object names of the blobs to read.
+
+    Yields
+    ------
+    bytes
+        The contents of each blob, in the order requested.
+    """
+    if not shas:
+        return
+
+    process = subprocess.Popen(
+        ["git", "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+
+    def request():
+        try:
+            for sha in shas:
+                process.stdin.write(f"{sha}\n".encode())
+        finally:
+            process.stdin.close()
+
+    thread = threading.Thread(target=request, daemon=True)
+    thread.start()
+    try:
+        for sha in shas:
+            header = process.stdout.readline().split()
+            if len(header) != 3:
+                raise LookupError(f"{sha}: unable to read object from the git index")
+            contents = process.stdout.read(int(header[2]))
+            process.stdout.read(1)
+            yield contents
+    finally:
+        process.stdout.close()
+        process.wait()
+        thread.join()
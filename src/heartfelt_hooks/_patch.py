@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from json.decoder import scanstring
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING_CHAR = re.compile(
+    r"\\u[dD][89abAB][0-9a-fA-F]{2}\\u[dD][c-fC-F][0-9a-fA-F]{2}"
+    r"|\\u[0-9a-fA-F]{4}|\\.|[^\\]",
+    re.DOTALL,
+)
+
+
+def patch_sources(text, sources):
+    """Write new cell sources into the JSON text of a notebook.
+
+    Only the characters of each line that changed are replaced, so the
+    indentation, key order and escapes of the rest of the file are kept.
+
+    Parameters
+    ----------
+    text : str
+        The notebook, as JSON.
+    sources : dict of int to str
+        The new source of each changed cell, by index. Each must have the
+        same number of lines as the cell it replaces.
+
+    Returns
+    -------
+    str or None
+        The patched notebook, or ``None`` if it couldn't be patched (the
+        cells aren't where an ``nbformat`` 4 notebook keeps them, or a
+        change touches escaped characters).
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._patch import patch_sources
+    >>> text = '{"cells": [{"source": ["### Title\\\\n", "text"]}]}'
+    >>> patch_sources(text, {0: "# Title\\ntext"})
+    '{"cells": [{"source": ["# Title\\\\n", "text"]}]}'
+    """
+    try:
+        spans = _source_spans(text)
+    except (ValueError, IndexError):
+        return None
+
+    edits = []
+    for cell, new in sources.items():
+        if cell >= len(spans) or spans[cell] is None:
+            return None
+        if (cell_edits := _line_edits(text, spans[cell], new)) is None:
+            return None
+        edits += cell_edits
+
+    for start, end, replacement in sorted(edits, reverse=True):
+        text = text[:start] + replacement + text[end:]
+    return text
+
+
+def _line_edits(text, spans, new):
+    """Edits that turn the strings at *spans* into *new*, a line at a time."""
+    offsets, old = [], []
+    for start, end in spans:
+        # every character, or escape, decodes to a single character
+        offsets += (
+            match.start() for match in _STRING_CHAR.finditer(text, start + 1, end - 1)
+        )
+        old.append(json.loads(text[start:end]))
+    offsets.append(spans[-1][1] - 1 if spans else 0)
+    old = "".join(old)
+
+    old_lines, new_lines = old.splitlines(True), new.splitlines(True)
+    if len(offsets) != len(old) + 1 or len(old_lines) != len(new_lines):
+        return None
+
+    edits, position = [], 0
+    for old_line, new_line in zip(old_lines, new_lines):
+        if old_line != new_line:
+            prefix = _common_prefix(old_line, new_line)
+            suffix = _common_prefix(old_line[prefix:][::-1], new_line[prefix:][::-1])
+            start, end = position + prefix, position + len(old_line) - suffix
+            text_start, text_end = offsets[start], offsets[end]
+            # each changed character must be written as itself, not escaped
+            if text[text_start:text_end] != old[start:end]:
+                return None
+            new_end = len(new_line) - suffix
+            replacement = new_line[prefix:new_end]
+            edits.append(
+                (
+                    text_start,
+                    text_end,
+                    json.dumps(replacement, ensure_ascii=False)[1:-1],
+                )
+            )
+        position += len(old_line)
+
+    return edits
+
+
+def _common_prefix(a, b):
+    return len(os.path.commonprefix((a, b)))
+
+
+def _source_spans(text):
+    """Find the strings that make up the source of each cell.
+
+    Returns
+    -------
+    list of list of tuple of (int, int)
+        The start and end of each JSON string of each cell's source, or
+        ``None`` for a cell without a source.
+    """
+    spans = []
+
+    def cell_field(key, pos):
+        if key == "source":
+            spans[-1] = _string_spans(text, pos)
+        return None
+
+    def cell(pos):
+        spans.append(None)
+        return _walk_object(text, pos, cell_field)
+
+    def notebook_field(key, pos):
+        return _walk_array(text, pos, cell) if key == "cells" else None
+
+    _walk_object(text, _skip(text, 0), notebook_field)
+    return spans
+
+
+def _string_spans(text, pos):
+    if text[pos] == '"':
+        return [(pos, scanstring(text, pos + 1)[1])]
+
+    spans = []
+
+    def string(pos):
+        if text[pos] != '"':
+            raise ValueError(f"expected a string at {pos}")
+        spans.append((pos, end := scanstring(text, pos + 1)[1]))
+        return end
+
+    _walk_array(text, pos, string)
+    return spans
+
+
+def _walk_object(text, pos, visit):
+    """Walk the members of a JSON object, returning where it ends.
+
+    *visit* is called with each key and the position of its value, and
+    returns the end of the value, or ``None`` to skip it.
+    """
+    if text[pos] != "{":
+        raise ValueError(f"expected an object at {pos}")
+    pos = _skip(text, pos + 1)
+    if text[pos] == "}":
+        return pos + 1
+
+    while True:
+        key, pos = scanstring(text, pos + 1)
+        pos = _skip(text, _skip(text, pos) + 1)
+        if (end := visit(key, pos)) is None:
+            _, end = _DECODER.raw_decode(text, pos)
+        pos = _skip(text, end)
+        if text[pos] == "}":
+            return pos + 1
+        pos = _skip(text, pos + 1)
+
+
+def _walk_array(text, pos, visit):
+    """Walk the items of a JSON array, as `_walk_object`, returning where it ends."""
+    if text[pos] != "[":
+        raise ValueError(f"expected an array at {pos}")
+    pos = _skip(text, pos + 1)
+    if text[pos] == "]":
+        return pos + 1
+
+    while True:
+        pos = _skip(text, visit(pos))
+        if text[pos] == "]":
+            return pos + 1
+        pos = _skip(text, pos + 1)
+
+
+def _skip(text, pos):
+    return _WHITESPACE.match(text, pos).end()
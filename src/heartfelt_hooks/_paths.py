@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import os
+import time
+from itertools import islice
+from pathlib import Path
+
+from rich import print
+from rich.text import Text
+
+from heartfelt_hooks._fail_fast import ErrorLimit
+from heartfelt_hooks._git import staged_files
+from heartfelt_hooks._logging import logger
+from heartfelt_hooks._profile import NullProfiler
+from heartfelt_hooks._progress import NullProgress
+
+CHUNK_SIZE = 16_384
+"""Number of paths that the filename checks handle at a time."""
+
+_SEPARATORS = os.sep + (os.altsep or "")
+
+
+def iter_chunks(files=(), file=None, staged=False, chunk_size=CHUNK_SIZE):
+    """Iterate over the paths given to a filename check, in chunks.
+
+    Paths are kept as strings, and a manifest is read a chunk at a time,
+    so that long lists of paths are not all held, or converted to `Path`
+    objects, at once.
+
+    Parameters
+    ----------
+    files : iterable of str, optional
+        Paths given as arguments.
+    file : file-like, optional
+        A manifest with a path on each line.
+    staged : bool, optional
+        If no paths were given, use the files staged in the git index.
+    chunk_size : int, optional
+        Maximum number of paths in each chunk.
+
+    Yields
+    ------
+    list of str
+        The next chunk of paths.
+    """
+    count = 0
+    for chunk in _chunked(files, chunk_size):
+        count += len(chunk)
+        yield chunk
+
+    if file is not None:
+        lines = (line.rstrip("\r\n") for line in file)
+        for chunk in _chunked(lines, chunk_size):
+            count += len(chunk)
+            yield chunk
+
+    if staged and not count:
+        yield from _chunked(staged_files(), chunk_size)
+
+
+def basename(path):
+    """The final component of a path, like `Path.name`.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._paths import basename
+    >>> basename("lessons/Week 1/intro.ipynb")
+    'intro.ipynb'
+    >>> basename("lessons/Week 1/")
+    'Week 1'
+    """
+    return os.path.basename(path.rstrip(_SEPARATORS))
+
+
+def stem(path):
+    """The final component of a path without its suffix, like `Path.stem`.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._paths import stem
+    >>> stem("lessons/archive.tar.gz")
+    'archive.tar'
+    >>> stem("lessons/.gitignore")
+    '.gitignore'
+    """
+    return os.path.splitext(basename(path))[0]
+
+
+def check_paths(chunks, is_bad, render=None, limit=None, profiler=None, progress=None):
+    """Check paths, a chunk at a time, and print those that are bad.
+
+    Parameters
+    ----------
+    chunks : iterable of list of str
+        The paths to check, as given by `iter_chunks`.
+    is_bad : callable
+        Called with each path, as a string, to tell if it is bad.
+    render : callable, optional
+        Called with each bad path, as a `Path`, to make the `Text` that shows
+        it. The default is the path in bold.
+    limit : ErrorLimit, optional
+        Stop once enough bad paths have been found.
+    profiler : Profiler, optional
+        Record the time spent checking, and printing, each path.
+    progress : Progress, optional
+        Advance as each chunk is checked.
+
+    Returns
+    -------
+    tuple of (int, int)
+        The number of paths checked, and of bad paths.
+    """
+    render = render or _render
+    limit = limit or ErrorLimit()
+    profiler = profiler or NullProfiler()
+    progress = progress or NullProgress()
+
+    checked = error_count = 0
+    for chunk in chunks:
+        reported = []
+        for count, filepath in enumerate(chunk, 1):
+            logger.info("checking: %s", filepath)
+
+            with profiler.phase(filepath, "check"):
+                bad = is_bad(filepath)
+
+            if bad:
+                error_count += 1
+                reported.append((Path(filepath), render(Path(filepath))))
+                logger.warning(filepath)
+
+                if limit.reached(error_count):
+                    chunk = chunk[:count]
+                    break
+
+        checked += len(chunk)
+        print_reported(reported, profiler)
+        progress.advance(len(chunk))
+
+        if limit.reached(error_count):
+            logger.warning("stopping after %d errors", error_count)
+            break
+
+    return checked, error_count
+
+
+def log_summary(checked, error_count):
+    """Log how many paths were checked, and how many of them are bad."""
+    summary = os.linesep.join(
+        [
+            "Summary:",
+            f"checked {checked} filename{'s' if checked != 1 else ''}",
+            f"found {error_count} bad filename{'s' if error_count != 1 else ''}",
+        ]
+    )
+
+    if error_count:
+        logger.warning(summary)
+        logger.error("💔")
+    else:
+        logger.info(summary)
+        logger.info("❤️")
+
+
+def print_reported(reported, profiler):
+    """Print the paths reported from a chunk together.
+
+    Parameters
+    ----------
+    reported : list of tuple of (Path, Text)
+        Each reported path and how to show it.
+    profiler : Profiler
+        Share the time spent printing between the reported paths.
+    """
+    if not reported:
+        return
+
+    start = time.perf_counter()
+    print(Text("\n").join(text for _, text in reported))
+    seconds = (time.perf_counter() - start) / len(reported)
+
+    for filepath, _ in reported:
+        profiler.add(filepath, "render", seconds)
+
+
+def _render(filepath):
+    return Text(str(filepath), style="bold")
+
+
+def _chunked(iterable, chunk_size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import rich_click as click
+
+from heartfelt_hooks._profile import NullProfiler
+from heartfelt_hooks._profile import Profiler
+from heartfelt_hooks._progress import NullProgress
+
+jobs_option = click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=0),
+    default=1,
+    help=(
+        "Number of files to process concurrently (0 means one per cpu). With more"
+        " than one job, reads, processing and writes are overlapped."
+    ),
+)
+
+_DONE = object()
+
+
+def imap(filepaths, func, jobs=1, profiler=None, prefetch=None, progress=None, **kwds):
+    """Read and process files, yielding results in the order of the files.
+
+    Parameters
+    ----------
+    filepaths : iterable of path
+        The files to process.
+    func : callable
+        Called as ``func(filepath, text, profiler=profiler, **kwds)`` with the
+        contents of each file. When running in parallel, *func* and its
+        arguments must be picklable.
+    jobs : int, optional
+        Number of worker processes. If 1, files are read and processed
+        serially; if 0, use one worker per cpu.
+    profiler : Profiler, optional
+        Record the time spent reading and processing each file.
+    prefetch : int, optional
+        Maximum number of files that are read ahead of the consumer.
+    progress : Progress, optional
+        Note when each file starts to be read.
+
+    Yields
+    ------
+    tuple of (path, object)
+        Each file along with the value returned by *func*.
+    """
+    profiler = profiler or NullProfiler()
+    progress = progress or NullProgress()
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1:
+        for filepath in filepaths:
+            progress.started(filepath)
+            with profiler.phase(filepath, "read"):
+                text = _read(filepath)
+            yield filepath, func(filepath, text, profiler=profiler, **kwds)
+    else:
+        yield from _Pipeline(
+            func,
+            jobs=jobs,
+            prefetch=prefetch or 2 * jobs,
+            profiler=profiler,
+            progress=progress,
+        ).run(filepaths, **kwds)
+
+
+def split_jobs(filepaths, jobs):
+    """Split jobs between files or, if there is just one file, its cells.
+
+    Returns
+    -------
+    tuple of (int, int)
+        The number of jobs to process files with, and the number of jobs to
+        process the cells of each file with.
+    """
+    if len(filepaths) == 1:
+        return 1, jobs
+    else:
+        return jobs, 1
+
+
+class Writer:
+    """Write files, in order, from a background thread.
+
+    Parameters
+    ----------
+    background : bool, optional
+        If ``False``, write immediately in the calling thread.
+    """
+
+    def __init__(self, background=True):
+        self._queue = queue.Queue(maxsize=64) if background else None
+        self._thread = None
+        self._error = None
+
+    def __enter__(self):
+        if self._queue is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        if self._thread is not None:
+            self._queue.put(_DONE)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def write(self, text, filepath=None):
+        """Write text to a file, or to stdout if *filepath* is not given."""
+        if self._thread is None:
+            _write(text, filepath)
+        else:
+            self._queue.put((text, filepath))
+
+    def _run(self):
+        while (item := self._queue.get()) is not _DONE:
+            if self._error is None:
+                try:
+                    _write(*item)
+                except Exception as error:
+                    self._error = error
+
+
+class _Pipeline:
+    """Prefetch files with asyncio and process them on a pool of workers."""
+
+    def __init__(self, func, jobs, prefetch, profiler, progress):
+        self._func = func
+        self._jobs = jobs
+        self._prefetch = prefetch
+        self._profiler = profiler
+        self._progress = progress
+
+    def run(self, filepaths, **kwds):
+        results = queue.Queue()
+        window = threading.Semaphore(self._prefetch)
+        stop = threading.Event()
+
+        thread = threading.Thread(
+            target=asyncio.run,
+            args=(self._produce(filepaths, kwds, results, window, stop),),
+            daemon=True,
+        )
+        thread.start()
+        try:
+            while (item := results.get()) is not _DONE:
+                window.release()
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            window.release()
+            thread.join()
+
+    async def _produce(self, filepaths, kwds, results, window, stop):
+        tasks = asyncio.Queue(maxsize=self._prefetch)
+
+        with ProcessPoolExecutor(max_workers=self._jobs) as pool:
+            scheduler = asyncio.create_task(
+                self._schedule(pool, filepaths, kwds, tasks, stop)
+            )
+            try:
+                while (task := await tasks.get()) is not None:
+                    item = await task
+                    await asyncio.to_thread(window.acquire)
+                    if stop.is_set():
+                        break
+                    results.put(item)
+            except Exception as error:
+                results.put(error)
+            finally:
+                scheduler.cancel()
+                while not tasks.empty():
+                    if task := tasks.get_nowait():
+                        task.cancel()
+                pool.shutdown(cancel_futures=True)
+                results.put(_DONE)
+
+    async def _schedule(self, pool, filepaths, kwds, tasks, stop):
+        loop = asyncio.get_running_loop()
+        profile = not isinstance(self._profiler, NullProfiler)
+
+        try:
+            for filepath in filepaths:
+                if stop.is_set():
+                    break
+                task = asyncio.create_task(
+                    self._process(loop, pool, filepath, kwds, profile)
+                )
+                try:
+                    await tasks.put(task)
+                except asyncio.CancelledError:
+                    # not yet queued, so not cancelled along with the queue
+                    task.cancel()
+                    raise
+        finally:
+            await tasks.put(None)
+
+    async def _process(self, loop, pool, filepath, kwds, profile):
+        self._progress.started(filepath)
+        with self._profiler.phase(filepath, "read"):
+            text = await asyncio.to_thread(_read, filepath)
+
+        result, timings = await loop.run_in_executor(
+            pool, _call, self._func, filepath, text, profile, kwds
+        )
+        for name, seconds in timings.items():
+            self._profiler.add(filepath, name, seconds)
+
+        return filepath, result
+
+
+def _call(func, filepath, text, profile, kwds):
+    profiler = Profiler() if profile else NullProfiler()
+    result = func(filepath, text, profiler=profiler, **kwds)
+    return result, profiler.timings.get(str(filepath), {})
+
+
+def _read(filepath):
+    return Path(filepath).read_text(encoding="utf-8")
+
+
+def _write(text, filepath=None):
+    if filepath is None:
+        sys.stdout.write(text)
+        if not text.endswith("\n"):
+            sys.stdout.write("\n")
+    else:
+        with open(filepath, "w", encoding="utf-8") as fp:
+            fp.write(text)
+            if not text.endswith("\n"):
+                fp.write("\n")
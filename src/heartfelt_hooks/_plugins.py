@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import functools
+import importlib
+import sys
+from importlib.metadata import entry_points
+from pathlib import Path
+
+from heartfelt_hooks._config import load_config
+
+ENTRY_POINT_GROUP = "heartfelt_hooks.validators"
+"""Entry point group that packages register their validators under."""
+
+BUILTIN_VALIDATORS = {
+    "indent": "heartfelt_hooks.check_heading_levels:IndentValidator",
+    "dedent": "heartfelt_hooks.check_heading_levels:DedentValidator",
+    "first": "heartfelt_hooks.check_heading_levels:StartsWithLevelOneValidator",
+    "level-one": (
+        "heartfelt_hooks.check_heading_levels:OneAndOnlyOneLevelOneValidator"
+    ),
+}
+
+READER_ENTRY_POINT_GROUP = "heartfelt_hooks.readers"
+"""Entry point group that packages register notebook readers under."""
+
+BUILTIN_READERS = {
+    ".ipynb": "heartfelt_hooks._readers:read_notebook",
+    ".py": "heartfelt_hooks._readers:read_script",
+    ".md": "heartfelt_hooks._readers:read_markdown",
+    ".myst": "heartfelt_hooks._readers:read_myst",
+    ".mystnb": "heartfelt_hooks._readers:read_myst",
+}
+
+NEEDS = frozenset(("headings", "cells", "outputs"))
+"""What a validator can ask to be given: headings, cells, or cells with outputs."""
+
+
+def available_validators(config=None):
+    """Find the validators that can be enabled, without importing them.
+
+    Validators are, in order of precedence, those listed in the
+    ``[tool.heartfelt-hooks.validators]`` table of ``pyproject.toml``,
+    those registered under the ``heartfelt_hooks.validators`` entry point
+    group, and the built-in validators.
+
+    Parameters
+    ----------
+    config : dict, optional
+        The ``[tool.heartfelt-hooks]`` configuration. The default is to
+        read it from the nearest ``pyproject.toml``.
+
+    Returns
+    -------
+    dict of str to str or EntryPoint
+        Where to load each validator from, by rule name.
+    """
+    config = load_config() if config is None else config
+
+    validators = dict(BUILTIN_VALIDATORS)
+    validators.update(
+        (entry_point.name, entry_point) for entry_point in _validator_entry_points()
+    )
+    validators.update(config.get("validators", {}))
+
+    return validators
+
+
+def load_validators(rules, config=None):
+    """Import the validators for a set of rules.
+
+    Parameters
+    ----------
+    rules : iterable of str
+        Names of the rules to load validators for.
+    config : dict, optional
+        The ``[tool.heartfelt-hooks]`` configuration. Its ``plugin-paths``
+        are added to ``sys.path`` before importing validators.
+
+    Returns
+    -------
+    list of type
+        The validator for each rule.
+
+    Raises
+    ------
+    ValueError
+        If there is no validator for a rule, or it needs something unknown.
+    """
+    config = load_config() if config is None else config
+    available = available_validators(config=config)
+
+    rules = list(dict.fromkeys(rules))
+    if unknown := [rule for rule in rules if rule not in available]:
+        raise ValueError(f"unknown rules: {', '.join(sorted(unknown))}")
+
+    _add_plugin_paths(config)
+
+    validators = []
+    for rule in rules:
+        validator = _load(available[rule])
+        if unknown := set(validator.needs) - NEEDS:
+            raise ValueError(f"{rule}: unknown needs: {', '.join(sorted(unknown))}")
+        validators.append(validator)
+
+    return validators
+
+
+def needs_of(validators):
+    """Everything that a set of validators need."""
+    return frozenset().union(*(validator.needs for validator in validators))
+
+
+def available_readers(config=None):
+    """Find the notebook readers for each file suffix, without importing them.
+
+    As with validators, readers listed in the ``[tool.heartfelt-hooks.readers]``
+    table of ``pyproject.toml`` take precedence over those registered under
+    the ``heartfelt_hooks.readers`` entry point group, which take precedence
+    over the built-in readers.
+
+    Parameters
+    ----------
+    config : dict, optional
+        The ``[tool.heartfelt-hooks]`` configuration. The default is to
+        read it from the nearest ``pyproject.toml``.
+
+    Returns
+    -------
+    dict of str to str or EntryPoint
+        Where to load each reader from, by file suffix.
+    """
+    return dict(_available_readers(_configured_readers(config)))
+
+
+def reader_for(filepath, config=None):
+    """Import the reader for a file, based on its suffix.
+
+    Files with a suffix that has no reader are read as ``.ipynb`` files.
+
+    Parameters
+    ----------
+    filepath : path
+        Path to the file.
+    config : dict, optional
+        The ``[tool.heartfelt-hooks]`` configuration.
+
+    Returns
+    -------
+    callable
+        The reader, called as ``reader(source, needs=needs)``.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._plugins import reader_for
+    >>> reader_for("notebook.py", config={}).__name__
+    'read_script'
+    >>> reader_for("notebook.md", config={".md": "json:loads"}).__name__
+    'read_markdown'
+    >>> reader_for("notebook.md", config={"readers": {".md": "json:loads"}}).__name__
+    'loads'
+    """
+    config = load_config() if config is None else config
+
+    if (spec := reader_spec(filepath, config=config)) not in BUILTIN_READERS.values():
+        _add_plugin_paths(config)
+
+    return _load(spec)
+
+
+def reader_spec(filepath, config=None):
+    """Where the reader for a file is loaded from, without importing it.
+
+    Parameters
+    ----------
+    filepath : path
+        Path to the file.
+    config : dict, optional
+        The ``[tool.heartfelt-hooks]`` configuration.
+
+    Returns
+    -------
+    str or EntryPoint
+        The reader's ``"module:attr"``, or its entry point.
+    """
+    readers = _available_readers(_configured_readers(config))
+    return readers.get(Path(filepath).suffix.lower(), BUILTIN_READERS[".ipynb"])
+
+
+def _configured_readers(config=None):
+    config = load_config() if config is None else config
+    return tuple(config.get("readers", {}).items())
+
+
+@functools.lru_cache(maxsize=None)
+def _available_readers(configured):
+    readers = dict(BUILTIN_READERS)
+    readers.update(
+        (entry_point.name, entry_point) for entry_point in _reader_entry_points()
+    )
+    readers.update(configured)
+
+    return readers
+
+
+@functools.lru_cache(maxsize=None)
+def _validator_entry_points():
+    return tuple(entry_points(group=ENTRY_POINT_GROUP))
+
+
+@functools.lru_cache(maxsize=None)
+def _reader_entry_points():
+    return tuple(entry_points(group=READER_ENTRY_POINT_GROUP))
+
+
+def _add_plugin_paths(config):
+    sys.path[:0] = [
+        path for path in config.get("plugin-paths", []) if path not in sys.path
+    ]
+
+
+def _load(spec):
+    if isinstance(spec, str):
+        module, _, attr = spec.partition(":")
+        return getattr(importlib.import_module(module), attr)
+    else:
+        return spec.load()
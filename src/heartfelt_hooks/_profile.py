@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import rich_click as click
+from rich.console import Console
+from rich.table import Table
+
+from heartfelt_hooks import _IMPORT_STARTED
+
+
+def profile_options(func):
+    """Add the ``--profile`` and ``--profile-output`` options to a command."""
+    func = click.option(
+        "--profile-output",
+        type=click.Path(dir_okay=False, writable=True),
+        envvar="HEARTFELT_PROFILE_OUTPUT",
+        help=(
+            "Write the timings to a file rather than printing a summary, as JSON"
+            " (*.json), speedscope (*.speedscope.json) or cProfile stats (*.prof)."
+        ),
+    )(func)
+    return click.option(
+        "--profile/--no-profile",
+        default=False,
+        envvar="HEARTFELT_PROFILE",
+        help="Time each phase of processing each file and print a summary.",
+    )(func)
+
+
+class Profiler:
+    """Record how long each phase of processing each file takes.
+
+    Parameters
+    ----------
+    dest : str or path, optional
+        Where to write the timings. If not provided, print a summary table.
+    top : int, optional
+        Number of slowest files to include in the summary.
+    """
+
+    def __init__(self, dest=None, top=10):
+        self._dest = None if dest is None else Path(dest)
+        self._top = top
+        self._events = []
+        self._cprofile = None
+
+        # time spent importing the hooks, and their dependencies, before the
+        # command ran, on the same clock as every other phase
+        self._started = time.perf_counter()
+        self._startup = self._started - _IMPORT_STARTED
+
+    @classmethod
+    def from_options(cls, profile=False, profile_output=None):
+        """Create a profiler from the ``--profile`` and ``--profile-output`` options."""
+        if profile or profile_output:
+            return cls(profile_output)
+        return NullProfiler()
+
+    def __enter__(self):
+        if self._dest and self._dest.name.endswith(".prof"):
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *args):
+        if self._cprofile:
+            self._cprofile.disable()
+        self.report()
+
+    @contextlib.contextmanager
+    def phase(self, filepath, name):
+        """Time a phase of processing a file."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._events.append((str(filepath), name, start, time.perf_counter()))
+
+    def add(self, filepath, name, seconds):
+        """Record a phase that was timed elsewhere (a worker, for instance)."""
+        end = time.perf_counter()
+        self._events.append((str(filepath), name, end - seconds, end))
+
+    @property
+    def timings(self):
+        """Total time spent in each phase, by file."""
+        timings = defaultdict(lambda: defaultdict(float))
+        for filepath, name, start, end in self._events:
+            timings[filepath][name] += end - start
+        return {filepath: dict(phases) for filepath, phases in timings.items()}
+
+    def report(self):
+        """Print, or write, the collected timings."""
+        if self._dest is None:
+            Console(stderr=True).print(*self.summary())
+        elif self._dest.name.endswith(".prof"):
+            self._cprofile.dump_stats(self._dest)
+        elif self._dest.name.endswith(".speedscope.json"):
+            self._dest.write_text(json.dumps(self.to_speedscope()))
+        else:
+            self._dest.write_text(json.dumps(self.to_dict(), indent=2))
+
+    def to_dict(self):
+        """Timings as a JSON-serializable dict."""
+        return {
+            "import": self._startup,
+            "wall": time.perf_counter() - self._started,
+            "files": self.timings,
+        }
+
+    def to_speedscope(self):
+        """Timings in speedscope's file format (as a sampled profile)."""
+        frames, index = [], {}
+        samples, weights = [], []
+
+        for filepath, name, start, end in self._events:
+            stack = []
+            for frame in (filepath, name):
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame})
+                stack.append(index[frame])
+            samples.append(stack)
+            weights.append(end - start)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": Path(sys.argv[0]).name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def summary(self):
+        """Tables of the time spent in each phase and of the slowest files."""
+        timings = self.timings
+
+        by_phase = defaultdict(list)
+        for filepath, phases in timings.items():
+            for name, seconds in phases.items():
+                by_phase[name].append((seconds, filepath))
+
+        phases = Table(title="Time by phase", title_justify="left")
+        phases.add_column("phase")
+        for column in ("total (s)", "mean (s)", "max (s)"):
+            phases.add_column(column, justify="right")
+        phases.add_column("slowest file")
+        phases.add_row("import", f"{self._startup:.3f}", "", "", "")
+        for name, entries in sorted(by_phase.items(), key=lambda item: -_total(item)):
+            seconds, filepath = max(entries)
+            total = sum(s for s, _ in entries)
+            phases.add_row(
+                name,
+                f"{total:.3f}",
+                f"{total / len(entries):.4f}",
+                f"{seconds:.4f}",
+                filepath,
+            )
+
+        files = Table(
+            title=f"Slowest {min(self._top, len(timings))} of {len(timings)} files",
+            title_justify="left",
+        )
+        files.add_column("file")
+        files.add_column("total (s)", justify="right")
+        files.add_column("slowest phase")
+        slowest = sorted(timings.items(), key=lambda item: -sum(item[1].values()))
+        for filepath, phases_ in slowest[: self._top]:
+            name = max(phases_, key=phases_.get)
+            files.add_row(
+                filepath,
+                f"{sum(phases_.values()):.4f}",
+                f"{name} ({phases_[name]:.4f}s)",
+            )
+
+        wall = time.perf_counter() - self._started
+        return phases, files, f"wall time: {wall:.3f}s{os.linesep}"
+
+
+class NullProfiler:
+    """A profiler that records nothing."""
+
+    _null = contextlib.nullcontext()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def phase(self, filepath, name):
+        return self._null
+
+    def add(self, filepath, name, seconds):
+        pass
+
+    @property
+    def timings(self):
+        return {}
+
+
+def _total(item):
+    return sum(seconds for seconds, _ in item[1])
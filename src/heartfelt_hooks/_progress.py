@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import rich
+import rich.progress
+from rich.console import Console
+
+
+class Progress:
+    """Show the progress of a run on a terminal.
+
+    The hooks only increment a counter, and note the files that are in
+    flight, as they go. A background thread reads those every *interval*
+    seconds and redraws the display, so updates cost next to nothing
+    however many files there are.
+
+    Parameters
+    ----------
+    total : int, optional
+        Number of files to process, if known.
+    console : Console, optional
+        Where to show the progress.
+    interval : float, optional
+        Seconds between updates of the display.
+    """
+
+    def __init__(self, total=None, console=None, interval=0.1):
+        self._total = total
+        self._console = console or rich.get_console()
+        self._interval = interval
+
+        self._count = 0
+        self._in_flight = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._progress = rich.progress.Progress(
+            rich.progress.SpinnerColumn(),
+            rich.progress.BarColumn(),
+            rich.progress.MofNCompleteColumn(),
+            rich.progress.TextColumn("{task.fields[rate]}"),
+            rich.progress.TimeElapsedColumn(),
+            rich.progress.TextColumn("{task.fields[slowest]}"),
+            console=self._console,
+            auto_refresh=False,
+            transient=True,
+            redirect_stdout=self._console is rich.get_console(),
+        )
+        self._task = self._progress.add_task("", total=total, rate="", slowest="")
+
+    @classmethod
+    def from_options(cls, silent=False, total=None):
+        """Create a progress display, unless *silent* or not on a terminal."""
+        if silent:
+            return NullProgress()
+
+        for console in (rich.get_console(), Console(stderr=True)):
+            if console.is_terminal:
+                return cls(total=total, console=console)
+        return NullProgress()
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self._progress.start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+        self._progress.stop()
+
+    def started(self, filepath):
+        """Note that processing of a file has started."""
+        self._in_flight[filepath] = time.perf_counter()
+
+    def advance(self, count=1):
+        """Count files, without noting which."""
+        self._count += count
+
+    def track(self, results):
+        """Count each ``(filepath, result)`` once it has been handled.
+
+        Parameters
+        ----------
+        results : iterable of tuple of (path, object)
+            Files, and their results, as yielded by `imap`.
+
+        Yields
+        ------
+        tuple of (path, object)
+            The items of *results*.
+        """
+        for filepath, result in results:
+            yield filepath, result
+            self._in_flight.pop(filepath, None)
+            self._count += 1
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self._update()
+
+    def _update(self):
+        now = time.perf_counter()
+        in_flight = self._in_flight.copy()
+
+        slowest = ""
+        if in_flight:
+            # files are added as they start, so the first has been running longest
+            filepath, started = next(iter(in_flight.items()))
+            slowest = f"{filepath!s} ({now - started:.1f}s)"
+
+        self._progress.update(
+            self._task,
+            completed=self._count,
+            rate=f"{self._count / (now - self._started):.1f} files/s",
+            slowest=slowest,
+        )
+        self._progress.refresh()
+
+
+class NullProgress:
+    """A progress display that shows nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def started(self, filepath):
+        pass
+
+    def advance(self, count=1):
+        pass
+
+    def track(self, results):
+        return results
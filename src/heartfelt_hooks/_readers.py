@@ -0,0 +1,496 @@
+from __future__ import annotations
+
+import json
+import re
+
+import nbformat
+
+from heartfelt_hooks._plugins import BUILTIN_READERS
+from heartfelt_hooks._plugins import NEEDS
+from heartfelt_hooks._plugins import reader_for
+from heartfelt_hooks._plugins import reader_spec
+
+_PERCENT_MARKER = re.compile(r"^# %%(?!%)(?P<marker>.*)$")
+_LIGHT_MARKER = re.compile(r"^# \+(?P<marker>\s.*)?$")
+_PERCENT_TYPE = re.compile(r"(?:^|\s)\[(?P<type>\w+)\](?=\s|$)")
+_OPTION_KEY = re.compile(r"(?:^|\s)(?P<key>[\w.-]+)=")
+_FENCE = re.compile(r"^ {0,3}(?P<fence>`{3,}|~{3,})\s*(?P<info>.*)$")
+_REGION = re.compile(r"^<!--\s*#(?P<kind>region|raw)\b(?P<options>.*?)-->\s*$")
+_MYST_BREAK = re.compile(r"^\+\+\+\s*(?P<metadata>.*)$")
+_MYST_OPTION = re.compile(r"^:[\w-]+:")
+_JUPYTEXT_KEY = re.compile(r"^(?:jupyter|jupytext|kernelspec):")
+
+_CELL_TYPES = {"markdown": "markdown", "md": "markdown", "raw": "raw"}
+
+
+def read_source(source, filepath=None, needs=NEEDS):
+    """Parse a notebook from the contents of a file, in whatever format it is in.
+
+    Parameters
+    ----------
+    source : str or bytes
+        Contents of the file.
+    filepath : path, optional
+        Path to the file, whose suffix picks the reader (see `reader_for`).
+        If not given, *source* is read as an ``.ipynb`` file.
+    needs : iterable of str, optional
+        What will be used from the notebook (``"headings"``, ``"cells"``
+        and ``"outputs"``).
+
+    Returns
+    -------
+    NotebookNode or dict
+        The notebook.
+    """
+    reader = read_notebook if filepath is None else reader_for(filepath)
+    return reader(source, needs=needs)
+
+
+def is_notebook(source, filepath):
+    """Whether a file holds a notebook, rather than plain text or code.
+
+    Scripts (``.py``) are notebooks if they have ``# %%`` markers or a
+    jupytext header, and markdown files (``.md``) if they are MyST
+    notebooks or have a jupytext header. Files of any other format with
+    a reader are always notebooks.
+
+    Parameters
+    ----------
+    source : str or bytes
+        Contents of the file.
+    filepath : path
+        Path to the file, whose suffix picks its format.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._readers import is_notebook
+    >>> is_notebook("# # Title\\n", "script.py")
+    False
+    >>> is_notebook("# ---\\n# jupyter:\\n#   jupytext: {}\\n# ---\\n", "script.py")
+    True
+    >>> is_notebook("# Readme\\n", "README.md")
+    False
+    """
+    spec = reader_spec(filepath)
+    if spec == BUILTIN_READERS[".py"]:
+        text = _decode(source)
+        return _is_percent(text) or _has_jupytext_header(text, prefix="# ")
+    elif spec == BUILTIN_READERS[".md"]:
+        text = _decode(source)
+        return _is_myst(text) or _has_jupytext_header(text)
+    else:
+        return True
+
+
+def read_notebook(source, needs=NEEDS):
+    """Parse the contents of a notebook file, doing only the work needed.
+
+    Parameters
+    ----------
+    source : str or bytes
+        Contents of the notebook file.
+    needs : iterable of str, optional
+        What will be used from the notebook (``"headings"``, ``"cells"``
+        and ``"outputs"``). Notebooks are only fully read, and validated,
+        if their outputs are needed. Otherwise outputs are dropped and,
+        if only the headings are needed, the notebook is left as plain
+        dicts and lists.
+
+    Returns
+    -------
+    NotebookNode or dict
+        The notebook.
+    """
+    if isinstance(source, bytes):
+        source = source.decode("utf-8")
+
+    if "outputs" in needs:
+        return nbformat.reads(source, as_version=4)
+
+    nb = json.loads(source)
+    if nb.get("nbformat") != 4:
+        return nbformat.reads(source, as_version=4)
+
+    for cell in nb.get("cells", []):
+        if isinstance(cell.get("source"), list):
+            cell["source"] = "".join(cell["source"])
+        if "outputs" in cell:
+            cell["outputs"] = []
+
+    return nbformat.from_dict(nb) if "cells" in needs else nb
+
+
+def read_script(source, needs=NEEDS):
+    """Read a jupytext script, in either the percent or the light format.
+
+    Scripts with ``# %%`` markers, or a ``format_name: percent`` header,
+    are read with `read_percent`, and others with `read_light`.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._readers import read_script
+    >>> nb = read_script("# %% [markdown]\\n# # Title\\n")
+    >>> [(cell["cell_type"], cell["source"]) for cell in nb["cells"]]
+    [('markdown', '# Title')]
+    >>> nb = read_script("# # Title\\n\\nx = 1\\n")
+    >>> [(cell["cell_type"], cell["source"]) for cell in nb["cells"]]
+    [('markdown', '# Title'), ('code', 'x = 1')]
+    """
+    text = _decode(source)
+    if _is_percent(text):
+        return read_percent(text, needs=needs)
+    return read_light(text, needs=needs)
+
+
+def read_percent(source, needs=NEEDS):
+    """Read a jupytext script in the percent format.
+
+    Cells start at ``# %%`` lines, with ``# %% [markdown]`` (or ``[md]``)
+    for markdown cells, whose lines are commented out, and ``# %% [raw]``
+    for raw cells, optionally after a title (``# %% Title [markdown]``).
+    Options after the marker, such as ``tags=["toc", "intro"]``, become the
+    cell's metadata.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._readers import read_percent
+    >>> nb = read_percent(
+    ...     'import os\\n\\n# %% [markdown] tags=["toc", "intro"]\\n\\n'
+    ...     "# %% Intro [md]\\n"
+    ...     "# # Title\\n#\\n# Some text.\\n\\n# %%\\nx = 1\\n"
+    ... )
+    >>> [(cell["cell_type"], cell["source"]) for cell in nb["cells"]]
+    [('code', 'import os'), ('markdown', ''), ('markdown', '# Title\\n\\nSome text.'),
+     ('code', 'x = 1')]
+    >>> nb["cells"][1]["metadata"]
+    {'tags': ['toc', 'intro']}
+    """
+    return _as_notebook(_iter_percent_cells(_decode(source)), needs)
+
+
+def read_light(source, needs=NEEDS):
+    """Read a jupytext script in the light format.
+
+    Paragraphs of comments, separated from code by blank lines, are
+    markdown cells, and other paragraphs are code cells, continuing the
+    previous code cell if indented. ``# +`` and ``# -`` lines mark the
+    start and end of a cell that may span blank lines, with
+    ``# + [markdown]`` for markdown cells, and options after the marker
+    become the cell's metadata.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._readers import read_light
+    >>> nb = read_light(
+    ...     "# # Title\\n#\\n# Some text.\\n\\n"
+    ...     "def f():\\n    x = 1\\n\\n    return x\\n\\n"
+    ...     '# + [markdown] tags=["toc"]\\n# Contents\\n\\n# More\\n# -\\n'
+    ... )
+    >>> [(cell["cell_type"], cell["source"]) for cell in nb["cells"]]
+    [('markdown', '# Title\\n\\nSome text.'),
+     ('code', 'def f():\\n    x = 1\\n\\n    return x'),
+     ('markdown', 'Contents\\n\\nMore')]
+    >>> nb["cells"][2]["metadata"]
+    {'tags': ['toc']}
+    """
+    return _as_notebook(_iter_light_cells(_decode(source)), needs)
+
+
+def read_markdown(source, needs=NEEDS):
+    """Read a jupytext markdown, or MyST markdown, notebook.
+
+    MyST notebooks are recognized by ``{code-cell}`` directives, ``+++``
+    cell breaks or a ``format_name: myst`` front matter, and read with
+    `read_myst`. Otherwise fenced code blocks with a language are code
+    cells, ``<!-- #region -->`` and ``<!-- #raw -->`` comments mark
+    markdown and raw cells, and everything else is markdown.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._readers import read_markdown
+    >>> nb = read_markdown(
+    ...     "---\\njupyter:\\n  kernelspec: {}\\n---\\n\\n# Title\\n\\n"
+    ...     "```python\\nx = 1\\n```\\n\\n## Section\\n"
+    ... )
+    >>> [(cell["cell_type"], cell["source"]) for cell in nb["cells"]]
+    [('markdown', '# Title'), ('code', 'x = 1'), ('markdown', '## Section')]
+    """
+    text = _decode(source)
+    if _is_myst(text):
+        return read_myst(text, needs=needs)
+    return _as_notebook(_iter_markdown_cells(text), needs)
+
+
+def read_myst(source, needs=NEEDS):
+    """Read a MyST markdown notebook, or page.
+
+    Code cells are ``{code-cell}`` directives, raw cells ``{raw-cell}``
+    directives, and markdown cells are separated by ``+++`` lines, which
+    may carry the following cell's metadata as JSON.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._readers import read_myst
+    >>> nb = read_myst(
+    ...     "# Title\\n\\n```{code-cell} ipython3\\n:tags: [hide]\\nx = 1\\n```\\n\\n"
+    ...     '+++ {"tags": ["toc"]}\\n\\nContents\\n\\n+++\\n\\n## Section\\n'
+    ... )
+    >>> [(cell["cell_type"], cell["source"]) for cell in nb["cells"]]
+    [('markdown', '# Title'), ('code', 'x = 1'), ('markdown', 'Contents'),
+     ('markdown', '## Section')]
+    >>> nb["cells"][2]["metadata"]
+    {'tags': ['toc']}
+    """
+    return _as_notebook(_iter_myst_cells(_decode(source)), needs)
+
+
+def _iter_percent_cells(text):
+    lines = _strip_front_matter(text.splitlines(), prefix="# ")
+
+    cell_type, metadata, cell_lines = "code", {}, []
+    for line in lines:
+        if match := _PERCENT_MARKER.match(line):
+            yield from _cell(cell_type, cell_lines, metadata, skip_empty=True)
+            cell_type, metadata = _parse_marker(match["marker"])
+            cell_lines = []
+        elif cell_type == "code":
+            cell_lines.append(line)
+        else:
+            cell_lines.append(_uncomment(line))
+
+    yield from _cell(cell_type, cell_lines, metadata, skip_empty=True)
+
+
+def _iter_light_cells(text):
+    lines = iter(_strip_front_matter(text.splitlines(), prefix="# "))
+
+    between = []
+    for line in lines:
+        if match := _LIGHT_MARKER.match(line):
+            yield from _light_paragraphs(between)
+            cell_type, metadata = _parse_marker(match["marker"] or "")
+            cell_lines = _until(lines, lambda line: line.rstrip() == "# -")
+            if cell_type != "code":
+                cell_lines = [_uncomment(line) for line in cell_lines]
+            yield from _cell(cell_type, cell_lines, metadata)
+            between = []
+        else:
+            between.append(line)
+
+    yield from _light_paragraphs(between)
+
+
+def _light_paragraphs(lines):
+    """Split the lines between explicit cells into markdown and code cells."""
+    code = []
+    for paragraph in _paragraphs(lines):
+        if all(_is_comment(line) for line in paragraph):
+            yield from _cell("code", code, skip_empty=True)
+            yield from _cell("markdown", [_uncomment(line) for line in paragraph])
+            code = []
+        elif code and paragraph[0][:1].isspace():
+            code += ["", *paragraph]
+        else:
+            yield from _cell("code", code, skip_empty=True)
+            code = paragraph
+
+    yield from _cell("code", code, skip_empty=True)
+
+
+def _is_comment(line):
+    return line.startswith("#") and not line.startswith("#!")
+
+
+def _paragraphs(lines):
+    paragraph = []
+    for line in lines:
+        if line.strip():
+            paragraph.append(line)
+        elif paragraph:
+            yield paragraph
+            paragraph = []
+    if paragraph:
+        yield paragraph
+
+
+def _iter_markdown_cells(text):
+    lines = iter(_strip_front_matter(text.splitlines()))
+
+    cell_lines = []
+    for line in lines:
+        if match := _FENCE.match(line):
+            if match["info"].strip():
+                yield from _cell("markdown", cell_lines, skip_empty=True)
+                yield from _cell("code", _until_fence(lines, match["fence"]))
+                cell_lines = []
+            else:
+                cell_lines += [line, *_until_fence(lines, match["fence"])]
+                cell_lines.append(match["fence"])
+        elif match := _REGION.match(line):
+            yield from _cell("markdown", cell_lines, skip_empty=True)
+            end = f"<!-- #end{match['kind']} -->"
+            yield from _cell(
+                "markdown" if match["kind"] == "region" else "raw",
+                _until(lines, lambda line, end=end: line.strip() == end),
+                _parse_options(match["options"]),
+            )
+            cell_lines = []
+        else:
+            cell_lines.append(line)
+
+    yield from _cell("markdown", cell_lines, skip_empty=True)
+
+
+def _iter_myst_cells(text):
+    lines = iter(_strip_front_matter(text.splitlines()))
+
+    metadata, cell_lines = {}, []
+    for line in lines:
+        if match := _MYST_BREAK.match(line):
+            yield from _cell("markdown", cell_lines, metadata, skip_empty=True)
+            metadata = _parse_json(match["metadata"])
+            cell_lines = []
+        elif (match := _FENCE.match(line)) and match["info"].startswith(
+            ("{code-cell}", "{raw-cell}")
+        ):
+            yield from _cell("markdown", cell_lines, metadata, skip_empty=True)
+            cell_type = "code" if match["info"].startswith("{code-cell}") else "raw"
+            yield from _cell(
+                cell_type, _strip_options(_until_fence(lines, match["fence"]))
+            )
+            metadata, cell_lines = {}, []
+        elif match:
+            cell_lines += [line, *_until_fence(lines, match["fence"])]
+            cell_lines.append(match["fence"])
+        else:
+            cell_lines.append(line)
+
+    yield from _cell("markdown", cell_lines, metadata, skip_empty=True)
+
+
+def _as_notebook(cells, needs):
+    nb = {"cells": list(cells), "metadata": {}, "nbformat": 4, "nbformat_minor": 5}
+    return nbformat.from_dict(nb) if set(needs) - {"headings"} else nb
+
+
+def _cell(cell_type, lines, metadata=None, skip_empty=False):
+    source = "\n".join(lines).strip("\n")
+    if skip_empty and not source and not metadata:
+        return
+
+    cell = {"cell_type": cell_type, "metadata": metadata or {}, "source": source}
+    if cell_type == "code":
+        cell.update(execution_count=None, outputs=[])
+    yield cell
+
+
+def _decode(source):
+    return source.decode("utf-8") if isinstance(source, bytes) else source
+
+
+def _is_percent(text):
+    return bool(
+        re.search(r"^# %%(?!%)", text, re.MULTILINE)
+        or re.search(r"^#\s+format_name:\s*percent\s*$", text, re.MULTILINE)
+    )
+
+
+def _is_myst(text):
+    return bool(
+        re.search(r"^(```+|~~~+)\s*\{(code|raw)-cell\}|^\+\+\+", text, re.MULTILINE)
+        or re.search(r"^\s*format_name:\s*myst\s*$", text, re.MULTILINE)
+    )
+
+
+def _has_jupytext_header(text, prefix=""):
+    lines = text.splitlines()
+    end = len(lines) - len(_strip_front_matter(lines, prefix=prefix))
+    header = lines[1:end]
+    return any(
+        _JUPYTEXT_KEY.match(line.removeprefix(prefix).rstrip()) for line in header
+    )
+
+
+def _strip_front_matter(lines, prefix=""):
+    """Drop a YAML header (``---`` lines, commented out with *prefix*)."""
+    delimiter = f"{prefix}---"
+    if not lines or lines[0].rstrip() != delimiter:
+        return lines
+    for end, line in enumerate(lines[1:], 2):
+        if line.rstrip() == delimiter:
+            return lines[end:]
+    return lines
+
+
+def _until(lines, is_end):
+    """Take lines up to, and dropping, the one that *is_end*."""
+    taken = []
+    for line in lines:
+        if is_end(line):
+            break
+        taken.append(line)
+    return taken
+
+
+def _until_fence(lines, fence):
+    char, length = fence[0], len(fence)
+
+    def is_end(line):
+        line = line.strip()
+        return len(line) >= length and line == char * len(line)
+
+    return _until(lines, is_end)
+
+
+def _strip_options(lines):
+    """Drop the ``:key: value`` options at the start of a MyST directive."""
+    for count, line in enumerate(lines):
+        if not _MYST_OPTION.match(line):
+            return lines[count:]
+    return []
+
+
+def _uncomment(line):
+    if line == "#":
+        return ""
+    return line[2:] if line.startswith("# ") else line
+
+
+def _parse_marker(marker):
+    """Split what follows ``# %%`` into the cell type and metadata."""
+    options = match.start() if (match := _OPTION_KEY.search(marker)) else len(marker)
+    cell_type = _PERCENT_TYPE.search(marker, 0, options)
+    return (
+        _CELL_TYPES.get(cell_type["type"] if cell_type else None, "code"),
+        _parse_options(marker[options:]),
+    )
+
+
+def _parse_options(options):
+    """Parse ``key=value`` options, whose values are JSON or bare words.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._readers import _parse_options
+    >>> _parse_options(' tags=["toc", "intro"] slideshow={"a": 1} lang=python')
+    {'tags': ['toc', 'intro'], 'slideshow': {'a': 1}, 'lang': 'python'}
+    """
+    decoder = json.JSONDecoder()
+
+    metadata, position = {}, 0
+    while match := _OPTION_KEY.search(options, position):
+        start = match.end()
+        try:
+            value, position = decoder.raw_decode(options, start)
+        except json.JSONDecodeError:
+            position = len(options) if (end := options.find(" ", start)) < 0 else end
+            value = options[start:position]
+        metadata[match["key"]] = value
+    return metadata
+
+
+def _parse_json(text):
+    try:
+        return json.loads(text) if text.strip() else {}
+    except json.JSONDecodeError:
+        return {}
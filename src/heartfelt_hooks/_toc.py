@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+
+from mistletoe import span_token
+
+
+def slugify(text):
+    """Convert heading text to an anchor, the way Jupyter does.
+
+    JupyterLab, Notebook and nbconvert take the text of the rendered
+    heading, without its inline markup, and keep its case and punctuation,
+    only replacing spaces with ``-``.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._toc import slugify
+    >>> slugify("Heading 1")
+    'Heading-1'
+    >>> slugify("What's new? (v1.0)")
+    "What's-new?-(v1.0)"
+    >>> slugify("The `run` **command**")
+    'The-run-command'
+    >>> slugify("Read [the docs](https://example.org)")
+    'Read-the-docs'
+    """
+    return plain_text(text).replace(" ", "-")
+
+
+def plain_text(text):
+    """The text of some inline markdown, as rendered, without its markup.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._toc import plain_text
+    >>> plain_text("See [the *docs*](https://example.org) ![logo](logo.png)")
+    'See the docs '
+    """
+    return "".join(_plain_text(token) for token in span_token.tokenize_inner(text))
+
+
+def _plain_text(token):
+    if isinstance(token, span_token.Image):
+        return ""
+    elif isinstance(token, span_token.RawText) or token.children is None:
+        return getattr(token, "content", "")
+    else:
+        return "".join(_plain_text(child) for child in token.children)
+
+
+class Slugger:
+    """Make unique anchors by appending a counter to repeated headings.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._toc import Slugger
+    >>> slugger = Slugger()
+    >>> [slugger.slug(text) for text in ("Examples", "Examples", "Examples-1")]
+    ['Examples', 'Examples-1', 'Examples-1-1']
+    """
+
+    def __init__(self):
+        self._occurrences = {}
+
+    def slug(self, text):
+        slug = original = slugify(text)
+        while slug in self._occurrences:
+            self._occurrences[original] += 1
+            slug = f"{original}-{self._occurrences[original]}"
+        self._occurrences[slug] = 0
+        return slug
+
+
+def render_toc(headings, max_depth=None):
+    """Render headings as a markdown table of contents.
+
+    Parameters
+    ----------
+    headings : sequence of tuple of (int, str)
+        The level and text of each heading.
+    max_depth : int, optional
+        Include only headings this many levels below the shallowest heading.
+
+    Returns
+    -------
+    str
+        The table of contents as a nested markdown list of links.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks._toc import render_toc
+    >>> print(render_toc(((2, "Intro"), (3, "Setup"), (4, "Detail"), (2, "Intro"))))
+    * [Intro](#Intro)
+      * [Setup](#Setup)
+        * [Detail](#Detail)
+    * [Intro](#Intro-1)
+    >>> print(render_toc(((2, "Intro"), (3, "Setup"), (4, "Detail")), max_depth=2))
+    * [Intro](#Intro)
+      * [Setup](#Setup)
+    """
+    if not headings:
+        return ""
+
+    min_level = min(level for level, _ in headings)
+    max_level = min_level + max_depth - 1 if max_depth else None
+
+    slugger = Slugger()
+    toc = []
+    for level, text in headings:
+        slug = slugger.slug(text)
+        if max_level is None or level <= max_level:
+            toc.append(f"{'  ' * (level - min_level)}* [{text}](#{slug})")
+
+    return os.linesep.join(toc)
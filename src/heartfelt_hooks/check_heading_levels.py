@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
 from dataclasses import dataclass
 from itertools import pairwise
 from pathlib import Path
@@ -13,8 +17,42 @@ import rich_click as click
 from rich import print
 from rich.text import Text
 
+from heartfelt_hooks._cache import ParsedNotebook
+from heartfelt_hooks._cache import ParseStore
+from heartfelt_hooks._cache import cache_option
+from heartfelt_hooks._config import load_config
+from heartfelt_hooks._fail_fast import ErrorLimit
+from heartfelt_hooks._fail_fast import fail_fast_options
+from heartfelt_hooks._git import blob_sha
+from heartfelt_hooks._git import cat_blobs
+from heartfelt_hooks._git import index_entries
+from heartfelt_hooks._git import staged_files
+from heartfelt_hooks._git import staged_option
 from heartfelt_hooks._logging import VERBOSITY
 from heartfelt_hooks._logging import logger
+from heartfelt_hooks._patch import patch_sources
+from heartfelt_hooks._pipeline import Writer
+from heartfelt_hooks._pipeline import imap
+from heartfelt_hooks._pipeline import jobs_option
+from heartfelt_hooks._pipeline import split_jobs
+from heartfelt_hooks._plugins import BUILTIN_READERS
+from heartfelt_hooks._plugins import BUILTIN_VALIDATORS
+from heartfelt_hooks._plugins import available_readers
+from heartfelt_hooks._plugins import load_validators
+from heartfelt_hooks._plugins import needs_of
+from heartfelt_hooks._plugins import reader_spec
+from heartfelt_hooks._profile import NullProfiler
+from heartfelt_hooks._profile import Profiler
+from heartfelt_hooks._profile import profile_options
+from heartfelt_hooks._progress import Progress
+from heartfelt_hooks._readers import is_notebook
+from heartfelt_hooks._readers import read_source
+from heartfelt_hooks._toc import render_toc
+
+SHARD_SIZE = 250_000
+"""Number of characters of markdown above which heading extraction is sharded."""
+
+_ATX_MARKER = re.compile(r"^( {0,3})(#{1,6})(?=[ \t\r\n]|$)")
 
 
 @click.command()
@@ -43,6 +81,28 @@ from heartfelt_hooks._logging import logger
     default=True,
     help="Check level one heading",
 )
+@click.option(
+    "--rule",
+    "rules",
+    multiple=True,
+    help=(
+        "Also check this rule, from a validator plugin or the"
+        " [tool.heartfelt-hooks.validators] table of pyproject.toml."
+    ),
+)
+@click.option(
+    "--fix",
+    is_flag=True,
+    help=(
+        "Rewrite heading levels in place to fix indent, dedent and first heading"
+        " errors."
+    ),
+)
+@staged_option
+@cache_option
+@jobs_option
+@fail_fast_options
+@profile_options
 @click.argument("files", nargs=-1, type=click.Path(exists=True))
 def check_heading_levels(
     silent,
@@ -53,53 +113,654 @@ def check_heading_levels(
     check_dedent,
     check_first,
     check_level_one,
+    rules,
+    fix,
+    staged,
+    cache,
+    jobs,
+    fail_fast,
+    max_errors,
+    profile,
+    profile_output,
 ) -> None:
+    if fix and staged:
+        raise click.UsageError("--fix can not be used with --staged.")
+
     logger.setLevel(VERBOSITY.get(verbose, logging.DEBUG))
     if silent:
         logger.setLevel(logging.ERROR)
 
     if file:
         files += tuple(file.read().splitlines())
-
-    validators = []
-    if check_indent:
-        validators.append(IndentValidator)
-    if check_dedent:
-        validators.append(DedentValidator)
-    if check_first:
-        validators.append(StartsWithLevelOneValidator)
-    if check_level_one:
-        validators.append(OneAndOnlyOneLevelOneValidator)
-
-    error_count = 0
-    for filepath in (Path(f) for f in files):
-        logger.info(f"checking: {filepath}")
-
-        errors = validate_filepath(filepath, validators=validators)
-
-        for log, info in errors:
-            print(Text(log, style="bold"))
-            logger.warning(info)
-
-        error_count += len(errors)
-
-    if error_count:
+    if staged and not files:
+        files = staged_notebooks()
+
+    validators = _select_validators(
+        indent=check_indent,
+        dedent=check_dedent,
+        first=check_first,
+        level_one=check_level_one,
+        rules=rules,
+    )
+
+    file_jobs, _ = split_jobs(files, jobs)
+    store = ParseStore.open() if cache else None
+    limit = ErrorLimit.from_options(fail_fast, max_errors)
+
+    error_count = fix_count = 0
+    with (
+        Profiler.from_options(profile, profile_output) as profiler,
+        Writer(background=file_jobs != 1) as writer,
+        Progress.from_options(silent, total=len(files)) as progress,
+        closing(
+            _results(
+                files,
+                validators,
+                staged=staged,
+                fix=fix,
+                jobs=jobs,
+                store=store,
+                max_errors=limit.max_errors,
+                profiler=profiler,
+                progress=progress,
+            )
+        ) as results,
+    ):
+        for filepath, result in progress.track(results):
+            logger.info("checking: %s", filepath)
+
+            if fix:
+                # fixes don't count toward the limit, only the errors left after fixing
+                errors, fixes, text = result
+                fix_count += _report_fixes(filepath, fixes, text, writer, profiler)
+            else:
+                errors = result
+            errors = errors[: limit.remaining(error_count)]
+
+            with profiler.phase(filepath, "render"):
+                for log, info in errors:
+                    print(Text(log, style="bold"))
+                    logger.warning(info)
+
+            error_count += len(errors)
+            if limit.reached(error_count):
+                logger.warning("stopping after %d errors", error_count)
+                break
+
+    if error_count + fix_count:
         logger.error("💔")
     else:
         logger.info("❤️")
 
-    sys.exit(error_count)
+    sys.exit(error_count + fix_count)
 
 
-def validate_filepath(filepath, validators=()):
-    errors = ([], [])
+def _results(
+    files,
+    validators,
+    staged=False,
+    fix=False,
+    jobs=1,
+    store=None,
+    max_errors=None,
+    profiler=None,
+    progress=None,
+):
+    file_jobs, cell_jobs = split_jobs(files, jobs)
+
+    if staged:
+        return _validate_staged(
+            files,
+            validators=validators,
+            jobs=jobs,
+            store=store,
+            max_errors=max_errors,
+            profiler=profiler,
+        )
+    elif fix:
+        return imap(
+            (Path(f) for f in files),
+            _fix_source,
+            jobs=file_jobs,
+            profiler=profiler,
+            progress=progress,
+            validators=validators,
+            cell_jobs=cell_jobs,
+            max_errors=max_errors,
+        )
+    else:
+        return imap(
+            (Path(f) for f in files),
+            _validate_source,
+            jobs=file_jobs,
+            profiler=profiler,
+            progress=progress,
+            validators=validators,
+            cell_jobs=cell_jobs,
+            store=store,
+            max_errors=max_errors,
+        )
+
+
+def _select_validators(
+    indent=True, dedent=True, first=True, level_one=True, rules=(), config=None
+):
+    config = load_config() if config is None else config
+
+    disabled = {
+        rule
+        for rule, enabled in (
+            ("indent", indent),
+            ("dedent", dedent),
+            ("first", first),
+            ("level-one", level_one),
+        )
+        if not enabled
+    }
+    enabled = config.get("check-heading-levels", {}).get(
+        "rules", list(BUILTIN_VALIDATORS)
+    )
+
+    try:
+        return load_validators(
+            [rule for rule in (*enabled, *rules) if rule not in disabled],
+            config=config,
+        )
+    except ValueError as error:
+        raise click.UsageError(str(error)) from None
+
+
+def _validate_source(
+    filepath,
+    source,
+    validators=(),
+    cell_jobs=1,
+    store=None,
+    max_errors=None,
+    profiler=None,
+):
+    profiler = profiler or NullProfiler()
+    needs = needs_of(validators)
+
+    with profiler.phase(filepath, "parse"):
+        nb = (
+            None
+            if needs <= {"headings"}
+            else read_source(source, filepath=filepath, needs=needs)
+        )
+        headings = (
+            cached_headings(
+                source, nb=nb, jobs=cell_jobs, store=store, filepath=filepath
+            )
+            if "headings" in needs
+            else None
+        )
+    with profiler.phase(filepath, "validate"):
+        return validate_filepath(
+            filepath,
+            validators=validators,
+            headings=headings,
+            nb=nb,
+            max_errors=max_errors,
+        )
+
+
+def _fix_source(
+    filepath,
+    source,
+    validators=(),
+    cell_jobs=1,
+    max_errors=None,
+    profiler=None,
+):
+    profiler = profiler or NullProfiler()
+    # only fix what the enabled rules check
+    rules = {validator.rule for validator in validators}
+
+    with profiler.phase(filepath, "parse"):
+        nb = read_source(source, filepath=filepath)
+        headings = NotebookHeadings.extract(nb, jobs=cell_jobs)
+    with profiler.phase(filepath, "fix"):
+        # only notebooks are rewritten, other formats belong to jupytext
+        fixes = (
+            fix_headings(
+                nb,
+                headings,
+                first=1 if "first" in rules else None,
+                indent="indent" in rules,
+                dedent="dedent" in rules,
+            )
+            if _is_ipynb(filepath)
+            else []
+        )
+    with profiler.phase(filepath, "validate"):
+        fixed = {id(heading): level for _, heading, level in fixes}
+        headings = [
+            (cell, Heading(fixed.get(id(heading), heading.level), heading.text))
+            for cell, heading in headings
+        ]
+        errors = validate_filepath(
+            filepath, validators=validators, headings=headings, max_errors=max_errors
+        )
+    with profiler.phase(filepath, "render"):
+        text = _fixed_text(source, nb, fixes) if fixes else None
+
+    return errors, fixes, text
+
+
+def _fixed_text(source, nb, fixes):
+    """Write the fixed headings into the notebook's own text, so that only
+    their markers change, falling back to writing the notebook out again.
+    """
+    if isinstance(source, bytes):
+        source = source.decode("utf-8")
+    text = patch_sources(source, {cell: nb.cells[cell].source for cell, _, _ in fixes})
+    return nbformat.writes(nb) if text is None else text
+
+
+def _report_fixes(filepath, fixes, text, writer, profiler):
+    with profiler.phase(filepath, "render"):
+        for cell, heading, level in fixes:
+            print(
+                Text(
+                    f"{filepath!s}:level={heading.level}(cell={cell}):fixed={level}",
+                    style="bold",
+                )
+            )
+            logger.info(f"{cell}: {'#' * level} {heading.text}")
+
+    if text is not None:
+        with profiler.phase(filepath, "write"):
+            logger.info(f"{filepath!s}: overwriting")
+            writer.write(text, filepath)
+
+    return len(fixes)
+
+
+def _validate_staged(
+    filepaths, validators=(), jobs=1, store=None, max_errors=None, profiler=None
+):
+    profiler = profiler or NullProfiler()
+
+    if needs_of(validators) - {"headings"}:
+        for filepath, source in _staged_sources(filepaths, profiler=profiler):
+            yield filepath, _validate_source(
+                filepath,
+                source,
+                validators=validators,
+                store=store,
+                max_errors=max_errors,
+                profiler=profiler,
+            )
+        return
+
+    for filepath, headings in staged_headings(
+        filepaths, jobs=jobs, store=store, profiler=profiler
+    ):
+        with profiler.phase(filepath, "validate"):
+            errors = validate_filepath(
+                filepath,
+                validators=validators,
+                headings=headings,
+                max_errors=max_errors,
+            )
+        yield filepath, errors
+
+
+def _staged_sources(filepaths, profiler=None):
+    profiler = profiler or NullProfiler()
+
+    filepaths = list(filepaths)
+    entries = index_entries(filepaths)
+
+    shas = [entries.get(os.path.normpath(filepath)) for filepath in filepaths]
+    blobs = cat_blobs([sha for sha in shas if sha])
+
+    for filepath, sha in zip(filepaths, shas):
+        with profiler.phase(filepath, "read"):
+            source = next(blobs) if sha else Path(filepath).read_bytes()
+        yield filepath, source
+
+
+def staged_notebooks():
+    """Paths of the staged notebooks, in any format that has a reader.
+
+    Staged scripts and markdown files that aren't notebooks (see
+    `is_notebook`), such as a README or a Python module, are left out.
+
+    Returns
+    -------
+    tuple of str
+        Paths to the notebooks.
+    """
+    filepaths = staged_files(suffixes=available_readers())
+    plain = {
+        filepath
+        for filepath, source in _staged_sources(
+            filepath for filepath in filepaths if not _is_ipynb(filepath)
+        )
+        if not is_notebook(source, filepath)
+    }
+    return tuple(filepath for filepath in filepaths if filepath not in plain)
+
+
+def staged_headings(filepaths, cells_to_ignore=None, jobs=1, store=None, profiler=None):
+    """Extract headings from the staged versions of notebooks.
+
+    Notebooks are read from the git index with a single ``git cat-file``
+    process. Notebooks already in the parse store are not read, or parsed,
+    again. Files that are not in the index are read from the working tree.
+
+    Parameters
+    ----------
+    filepaths : iterable of str
+        Paths to the notebooks.
+    cells_to_ignore : iterable of str, optional
+        Skip cells tagged with any of these tags.
+    jobs : int, optional
+        Number of processes to extract the headings of large notebooks with.
+    store : ParseStore, optional
+        Where to look for, and keep, parsed notebooks.
+    profiler : Profiler, optional
+        Record the time spent reading and parsing each notebook.
+
+    Yields
+    ------
+    tuple of (str, list)
+        Each path along with its ``(cell_index, Heading)`` pairs.
+    """
+    profiler = profiler or NullProfiler()
+
+    filepaths = list(filepaths)
+    entries = index_entries(filepaths)
+
+    shas = [entries.get(os.path.normpath(filepath)) for filepath in filepaths]
+    stored = [
+        bool(sha and store is not None and _store_key(sha, filepath) in store)
+        for filepath, sha in zip(filepaths, shas)
+    ]
+    blobs = cat_blobs([sha for sha, hit in zip(shas, stored) if sha and not hit])
+
+    for filepath, sha, hit in zip(filepaths, shas, stored):
+        if hit:
+            source = None
+        else:
+            with profiler.phase(filepath, "read"):
+                source = next(blobs) if sha else Path(filepath).read_bytes()
+        with profiler.phase(filepath, "parse"):
+            headings = cached_headings(
+                source,
+                cells_to_ignore=cells_to_ignore,
+                jobs=jobs,
+                store=store,
+                key=sha,
+                filepath=filepath,
+            )
 
-    for validator in (cls(filepath) for cls in validators):
+        yield filepath, headings
+
+
+def cached_headings(
+    source, cells_to_ignore=None, nb=None, jobs=1, store=None, key=None, filepath=None
+):
+    """Extract the headings of a notebook, using the parse store.
+
+    Parameters
+    ----------
+    source : str or bytes
+        Contents of the notebook file. Only read if the notebook isn't in
+        the store, and *nb* isn't given.
+    cells_to_ignore : iterable of str, optional
+        Skip cells tagged with any of these tags.
+    nb : NotebookNode, optional
+        The notebook, if it has already been read.
+    jobs : int, optional
+        Number of processes to extract the headings of large notebooks with.
+    store : ParseStore, optional
+        Where to look for, and keep, the parsed notebook.
+    key : str, optional
+        The object name that git gives *source*, which keys the notebook in
+        the store. Only give it for a staged blob; otherwise *source* is
+        hashed as it was read, as a working-tree file can differ from its
+        staged blob (line endings, or git's clean filters).
+    filepath : path, optional
+        Path to the notebook, whose suffix picks the reader (see
+        `read_source`). The default is to read *source* as an ``.ipynb``.
+
+    Returns
+    -------
+    list of tuple of (int, Heading)
+        The index of the cell that each heading is in, and the heading.
+    """
+    if store is None:
+        if nb is None:
+            nb = read_source(source, filepath=filepath, needs={"headings"})
+        return NotebookHeadings.extract(nb, cells_to_ignore=cells_to_ignore, jobs=jobs)
+
+    key = key or blob_sha(source)
+    if (parsed := store.get(_store_key(key, filepath))) is None:
+        if source is None:
+            [source] = cat_blobs([key])
+        if nb is None:
+            nb = read_source(source, filepath=filepath, needs={"headings"})
+        parsed = parse_notebook(nb, jobs=jobs)
+        store.put(_store_key(key, filepath), parsed)
+
+    return [
+        (cell, Heading(level, text))
+        for cell, level, text in parsed.headings(cells_to_ignore)
+    ]
+
+
+def _store_key(key, filepath=None):
+    """Key a file in the parse store by its object name and, unless a notebook,
+    the reader it is read with, as the same contents read by another reader
+    are another notebook.
+    """
+    if _is_ipynb(filepath):
+        return key
+    spec = reader_spec(filepath)
+    spec = getattr(spec, "value", spec)
+    return f"{key}-{hashlib.sha1(spec.encode()).hexdigest()[:12]}"
+
+
+def _is_ipynb(filepath=None):
+    return filepath is None or reader_spec(filepath) == BUILTIN_READERS[".ipynb"]
+
+
+def parse_notebook(nb, jobs=1):
+    """Parse a notebook for the parse store.
+
+    Parameters
+    ----------
+    nb : NotebookNode or dict
+        The notebook.
+    jobs : int, optional
+        Number of processes to extract the headings of large notebooks with.
+
+    Returns
+    -------
+    ParsedNotebook
+        The cells, tags and headings of the notebook.
+    """
+    return ParsedNotebook.from_notebook(
+        nb,
+        [
+            (cell, heading.level, heading.text)
+            for cell, heading in NotebookHeadings.extract(nb, jobs=jobs)
+        ],
+    )
+
+
+def validate_filepath(filepath, validators=(), headings=None, nb=None, max_errors=None):
+    """Check a notebook's headings.
+
+    Parameters
+    ----------
+    filepath : path
+        Path to the notebook. Only read if neither *headings* nor *nb* are
+        given, or the validators need more than headings.
+    validators : iterable of type
+        The validators to run, in order.
+    headings : list of tuple of (int, Heading), optional
+        The headings of the notebook.
+    nb : NotebookNode, optional
+        The notebook.
+    max_errors : int, optional
+        Don't run the remaining validators once this many errors are found.
+
+    Returns
+    -------
+    tuple of tuple of (str, str)
+        The log line, and a longer description, of each error.
+    """
+    needs = needs_of(validators)
+
+    if nb is None and (needs - {"headings"} or headings is None):
+        nb = read_source(Path(filepath).read_bytes(), filepath=filepath)
+    if headings is None and "headings" in needs:
+        headings = NotebookHeadings.extract(nb)
+
+    logs, infos = [], []
+
+    for validator in (cls(filepath, headings=headings, nb=nb) for cls in validators):
         validator.validate()
-        errors[0] += validator.log()
-        errors[1] += validator.info()
+        logs += validator.log()
+        infos += validator.info()
+        if max_errors is not None and len(logs) >= max_errors:
+            break
+
+    return tuple(zip(logs, infos))
+
+
+def remap_levels(levels, first=1, indent=True, dedent=True):
+    """Map heading levels onto levels that neither skip nor dedent too far.
+
+    Each heading becomes one level below the closest preceding heading
+    with a lower original level, so skipped levels are collapsed while
+    the structure of the headings is kept. Headings that are already
+    consistent keep their level.
+
+    Parameters
+    ----------
+    levels : iterable of int
+        Levels of the headings, in order.
+    first : int, optional
+        Level of the first heading, with the others shifted along with it.
+        If ``None``, keep the level of the first heading.
+    indent : bool, optional
+        Collapse skipped levels. Otherwise, headings keep their distance
+        from the heading they are below.
+    dedent : bool, optional
+        Move headings that dedent below the first heading up to its level.
+        If the first heading is kept, and is too deep for the headings below
+        them to fit, they are left where they are.
+
+    Returns
+    -------
+    list of int
+        The new level of each heading.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks.check_heading_levels import remap_levels
+    >>> remap_levels([2, 4, 4, 3, 2, 5])
+    [1, 2, 2, 2, 1, 2]
+    >>> remap_levels([2, 4, 1, 3], first=None)
+    [2, 3, 2, 3]
+    >>> remap_levels([1, 2, 3, 2, 3])
+    [1, 2, 3, 2, 3]
+    >>> remap_levels([2, 4, 1, 3], first=None, indent=False, dedent=False)
+    [2, 4, 1, 3]
+    >>> remap_levels([6, 1, 3, 4], first=None)
+    [6, 1, 2, 3]
+    """
+    levels = list(levels)
+    if not levels:
+        return []
+
+    top = levels[0]
+    shift = 0 if first is None else first - top
+
+    new_levels, clipped = _remap(levels, top, shift, indent=indent, dedent=dedent)
+    if clipped and first is None and dedent:
+        new_levels, _ = _remap(levels, top, shift, indent=indent, dedent=False)
+    return new_levels
+
+
+def _remap(levels, top, shift, indent=True, dedent=True):
+    """Remap levels below a first heading at level *top*, shifted by *shift*,
+    and whether any had to be clipped to fit between one and six.
+    """
+    new_levels = []
+    stack = []
+    clipped = False
+    for level in levels:
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        if stack:
+            parent, new_parent = stack[-1]
+            new_level = new_parent + (1 if indent else level - parent)
+        else:
+            new_level = (top if dedent else level) + shift
+        clipped = clipped or not 1 <= new_level <= 6
+        new_level = max(1, min(new_level, 6))
+        stack.append((level, new_level))
+        new_levels.append(new_level)
+    return new_levels, clipped
+
+
+def fix_headings(nb, headings, first=1, indent=True, dedent=True):
+    """Rewrite the markers of headings whose level is inconsistent.
+
+    Only the ``#`` markers of the affected headings are changed, so the
+    rest of each cell is left as it was.
+
+    Parameters
+    ----------
+    nb : NotebookNode
+        The notebook, which is modified in place.
+    headings : list of tuple of (int, Heading)
+        The headings of the notebook, as returned by `NotebookHeadings.extract`.
+    first : int, optional
+        Level of the first heading, or ``None`` to keep it as it is.
+    indent, dedent : bool, optional
+        Fix headings that indent, or dedent, too far (see `remap_levels`).
+
+    Returns
+    -------
+    list of tuple of (int, Heading, int)
+        The cell, original heading, and new level of each heading that changed.
+    """
+    levels = remap_levels(
+        (heading.level for _, heading in headings),
+        first=first,
+        indent=indent,
+        dedent=dedent,
+    )
+
+    changes = {}
+    for (cell, heading), level in zip(headings, levels):
+        changes.setdefault(cell, []).append((heading, level))
+
+    fixes = []
+    for cell, cell_changes in changes.items():
+        if all(heading.level == level for heading, level in cell_changes):
+            continue
+        lines = nb.cells[cell]["source"].splitlines(keepends=True)
+        tokens = [
+            token
+            for token in mistletoe.Document(lines).children
+            if isinstance(token, mistletoe.block_token.Heading)
+        ]
+        for token, (heading, level) in zip(tokens, cell_changes):
+            lineno = token.line_number - 1
+            if heading.level != level and _ATX_MARKER.match(lines[lineno]):
+                lines[lineno] = _ATX_MARKER.sub(rf"\g<1>{'#' * level}", lines[lineno])
+                fixes.append((cell, heading, level))
+        nb.cells[cell]["source"] = "".join(lines)
 
-    return tuple(zip(errors))
+    return fixes
 
 
 @dataclass
@@ -108,13 +769,45 @@ class Heading:
     text: str
 
 
+@dataclass(frozen=True, slots=True)
+class HeadingError:
+    """A heading that breaks a rule.
+
+    Attributes
+    ----------
+    rule : str
+        Name of the rule that was broken.
+    cell : int
+        Index of the cell that contains the heading.
+    level : int
+        Level of the heading.
+    text : str
+        Text of the heading.
+    ref_cell, ref_level : int, optional
+        Cell and level of the heading that this heading was compared with.
+    """
+
+    rule: str
+    cell: int
+    level: int
+    text: str
+    ref_cell: int | None = None
+    ref_level: int | None = None
+
+
 class NotebookHeadings:
-    def __init__(self, filepath, cells_to_ignore=None):
+    def __init__(self, filepath, cells_to_ignore=None, nb=None, jobs=1, headings=None):
         self._filepath = filepath
         self._cells_to_ignore = cells_to_ignore
-        self._nb = nbformat.read(filepath, as_version=4)
+        if nb is None:
+            nb = read_source(Path(filepath).read_bytes(), filepath=filepath)
+        self._nb = nb
 
-        self._headings = self.extract(self._nb, cells_to_ignore=self._cells_to_ignore)
+        if headings is None:
+            headings = self.extract(
+                self._nb, cells_to_ignore=self._cells_to_ignore, jobs=jobs
+            )
+        self._headings = headings
 
     @property
     def nb(self):
@@ -133,56 +826,118 @@ class NotebookHeadings:
             yield heading.level, heading.text
 
     def __str__(self):
-        min_level = self.min_level
-        toc = []
-        for level, text in self:
-            toc.append(
-                f"{'  ' * (level - min_level)}* [{text}](#{text.replace(' ', '-')})"
-            )
-        return os.linesep.join(toc)
+        return self.toc()
+
+    def toc(self, max_depth=None):
+        """Render the headings as a markdown table of contents.
+
+        Parameters
+        ----------
+        max_depth : int, optional
+            Include only headings this many levels below the shallowest heading.
+        """
+        return render_toc(list(self), max_depth=max_depth)
 
     @staticmethod
-    def extract(nb, cells_to_ignore=None):
+    def extract(nb, cells_to_ignore=None, jobs=1, shard_size=SHARD_SIZE):
+        """Extract the headings from the markdown cells of a notebook.
+
+        Parameters
+        ----------
+        nb : NotebookNode
+            The notebook.
+        cells_to_ignore : iterable of str, optional
+            Skip cells tagged with any of these tags.
+        jobs : int, optional
+            Number of processes to shard the markdown cells over (0 means one
+            per cpu). Only used if the notebook has at least *shard_size*
+            characters of markdown.
+        shard_size : int, optional
+            Number of characters of markdown above which to shard.
+
+        Returns
+        -------
+        list of tuple of (int, Heading)
+            The index of the cell that each heading is in, and the heading.
+        """
         cells_to_ignore = cells_to_ignore if cells_to_ignore else []
 
-        headings = []
-        for count, cell in enumerate(nb.cells):
+        cells = []
+        for count, cell in enumerate(nb["cells"]):
             tags = set(cell.get("metadata", {}).get("tags", []))
             if tags.isdisjoint(cells_to_ignore) and cell["cell_type"] == "markdown":
-                headings_in_cell = NotebookHeadings._extract_headings_from_source(
-                    cell["source"]
-                )
+                cells.append((count, cell["source"]))
 
-                for h in headings_in_cell:
-                    headings.append((count, h))
+        if jobs != 1 and sum(len(source) for _, source in cells) >= shard_size:
+            return NotebookHeadings._extract_sharded(cells, jobs=jobs)
+        else:
+            return NotebookHeadings._extract_from_cells(cells)
+
+    @staticmethod
+    def _extract_from_cells(cells):
+        headings = []
+        for count, source in cells:
+            for h in NotebookHeadings._extract_headings_from_source(source):
+                headings.append((count, h))
 
         return headings
 
+    @staticmethod
+    def _extract_sharded(cells, jobs=0):
+        jobs = jobs or os.cpu_count() or 1
+        n_shards = min(len(cells), 4 * jobs)
+
+        shards = [cells[i::n_shards] for i in range(n_shards)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(NotebookHeadings._extract_from_cells, shards)
+
+        return sorted(
+            (heading for shard in results for heading in shard),
+            key=lambda heading: heading[0],
+        )
+
     @staticmethod
     def _extract_headings_from_source(source):
-        doc = mistletoe.Document(source)
+        lines = source.splitlines(keepends=True)
+        doc = mistletoe.Document(lines)
 
         headings = []
         for child in doc.children:
             if isinstance(child, mistletoe.block_token.Heading):
-                headings.append(Heading(level=child.level, text=_get_content(child)))
+                text = _get_content(lines[child.line_number - 1])
+                headings.append(Heading(level=child.level, text=text))
 
         return headings
 
 
-def _get_content(token):
-    if hasattr(token, "children") and token.children:
-        return _get_content(token.children[0])
-    else:
-        return token.content
+def _get_content(line):
+    """The text of an ATX heading, with its inline markup."""
+    match = mistletoe.block_token.Heading.pattern.match(line.rstrip("\r\n") + "\n")
+    content = (match.group(2) or "").strip()
+    return "" if set(content) == {"#"} else content
 
 
 class NotebookHeadingValidator:
-    def __init__(self, filepath):
+    """Base class for validators.
+
+    Subclasses set ``rule`` to the name of the rule they check and
+    ``needs`` to what they use from a notebook: ``"headings"`` (passed
+    as *headings*), ``"cells"`` or ``"outputs"`` (passed as *nb*, with or
+    without the outputs of its code cells).
+    """
+
+    rule = None
+    needs = frozenset({"headings"})
+
+    def __init__(self, filepath, headings=None, nb=None):
         self._filepath = filepath
-        nb = nbformat.read(filepath, as_version=4)
+        if nb is None and (self.needs - {"headings"} or headings is None):
+            nb = read_source(Path(filepath).read_bytes(), filepath=filepath)
+        if headings is None and "headings" in self.needs:
+            headings = NotebookHeadings.extract(nb)
 
-        self._headings = NotebookHeadings.extract(nb)
+        self._nb = nb
+        self._headings = headings
         self._errors = []
 
     @property
@@ -192,6 +947,20 @@ class NotebookHeadingValidator:
     def validate(self):
         pass
 
+    def errors(self):
+        """The errors found by the last call to validate, as HeadingError."""
+        return [
+            HeadingError(
+                rule=self.rule,
+                cell=next_[0],
+                level=next_[1].level,
+                text=next_[1].text,
+                ref_cell=prev[0],
+                ref_level=prev[1].level,
+            )
+            for prev, next_ in self._errors
+        ]
+
     def log(self):
         entries = []
 
@@ -244,16 +1013,19 @@ class NotebookHeadingValidator:
         return headings
 
 
-class OneAndOnlyOneLevelOneValidator(NotebookHeadingValidator):
-    def validate(self):
-        errors = []
-        level_one = [
-            (cell, heading) for cell, heading in self._headings if heading.level == 1
+class SingleHeadingValidator(NotebookHeadingValidator):
+    """Base class for validators whose errors are single headings.
+
+    ``validate`` sets ``self._errors`` to a list of ``(cell, Heading)``.
+    """
+
+    def errors(self):
+        return [
+            HeadingError(
+                rule=self.rule, cell=cell, level=heading.level, text=heading.text
+            )
+            for cell, heading in self._errors
         ]
-        if len(level_one) != 1:
-            errors += level_one
-        self._errors = errors
-        return len(errors)
 
     def log(self):
         entries = []
@@ -266,8 +1038,6 @@ class OneAndOnlyOneLevelOneValidator(NotebookHeadingValidator):
             entries.append(":".join(parts))
         return entries
 
-        return entries
-
     def info(self):
         entries = []
 
@@ -281,7 +1051,23 @@ class OneAndOnlyOneLevelOneValidator(NotebookHeadingValidator):
         return entries
 
 
+class OneAndOnlyOneLevelOneValidator(SingleHeadingValidator):
+    rule = "level-one"
+
+    def validate(self):
+        errors = []
+        level_one = [
+            (cell, heading) for cell, heading in self._headings if heading.level == 1
+        ]
+        if len(level_one) != 1:
+            errors += level_one
+        self._errors = errors
+        return len(errors)
+
+
 class StartsWithLevelOneValidator(OneAndOnlyOneLevelOneValidator):
+    rule = "first"
+
     def validate(self):
         errors = []
 
@@ -295,6 +1081,8 @@ class StartsWithLevelOneValidator(OneAndOnlyOneLevelOneValidator):
 
 
 class IndentValidator(NotebookHeadingValidator):
+    rule = "indent"
+
     def validate(self):
         errors = []
         for prev, next_ in pairwise(self._headings):
@@ -305,6 +1093,8 @@ class IndentValidator(NotebookHeadingValidator):
 
 
 class DedentValidator(NotebookHeadingValidator):
+    rule = "dedent"
+
     def validate(self):
         errors = []
 
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import functools
 import logging
-import os
 import sys
-from pathlib import Path
 
 import rich_click as click
-from rich import print
-from rich.text import Text
 
+from heartfelt_hooks._fail_fast import ErrorLimit
+from heartfelt_hooks._fail_fast import fail_fast_options
+from heartfelt_hooks._git import staged_option
 from heartfelt_hooks._logging import VERBOSITY
 from heartfelt_hooks._logging import logger
+from heartfelt_hooks._paths import check_paths
+from heartfelt_hooks._paths import iter_chunks
+from heartfelt_hooks._paths import log_summary
+from heartfelt_hooks._paths import stem
+from heartfelt_hooks._profile import Profiler
+from heartfelt_hooks._profile import profile_options
+from heartfelt_hooks._progress import Progress
 
 
 @click.command()
@@ -27,46 +34,52 @@ from heartfelt_hooks._logging import logger
 @click.option("--sausage/--no-sausage", default=True, help="Allow sausage case.")
 @click.option("--snake/--no-snake", default=True, help="Allow snake case.")
 @click.option("--file", help="Read files names from a file.", type=click.File("r"))
+@staged_option
+@fail_fast_options
+@profile_options
 @click.argument("files", nargs=-1, type=click.Path(exists=True))
-def check_snake_case(silent, verbose, file, files, sausage, snake) -> None:
+def check_snake_case(
+    silent,
+    verbose,
+    file,
+    staged,
+    fail_fast,
+    max_errors,
+    profile,
+    profile_output,
+    files,
+    sausage,
+    snake,
+) -> None:
     logger.setLevel(VERBOSITY.get(verbose, logging.DEBUG))
     if silent:
         logger.setLevel(logging.ERROR)
 
-    if file:
-        files += tuple(file.read().splitlines())
-
-    error_count = 0
-    for filepath in (Path(f) for f in files):
-        logger.info(f"checking: {filepath}")
-
-        stem = filepath.stem
-
-        if (
-            (not sausage and _is_sausage(stem))
-            or (not snake and _is_snake(stem))
-            or _is_sausage_snake(stem)
-        ):
-            error_count += 1
-            print(Text(str(filepath), style="bold"))
+    with (
+        Profiler.from_options(profile, profile_output) as profiler,
+        Progress.from_options(
+            silent, total=len(files) if files and not file else None
+        ) as progress,
+    ):
+        checked, error_count = check_paths(
+            iter_chunks(files, file=file, staged=staged),
+            functools.partial(_is_bad, sausage=sausage, snake=snake),
+            limit=ErrorLimit.from_options(fail_fast, max_errors),
+            profiler=profiler,
+            progress=progress,
+        )
+
+    log_summary(checked, error_count)
+    sys.exit(error_count)
 
-            logger.warning(filepath)
 
-    summary = os.linesep.join(
-        [
-            "Summary:",
-            f"checked {len(files)} filename{'s' if len(files) != 1 else ''}",
-            f"found {error_count} bad filename{'s' if error_count != 1 else ''}",
-        ]
+def _is_bad(filepath, sausage=True, snake=True):
+    name = stem(filepath)
+    return (
+        (not sausage and _is_sausage(name))
+        or (not snake and _is_snake(name))
+        or _is_sausage_snake(name)
     )
-    if error_count:
-        logger.warning(summary)
-        logger.error("💔")
-    else:
-        logger.info(summary)
-        logger.info("❤️")
-
-    sys.exit(error_count)
 
 
 def _is_sausage(name):
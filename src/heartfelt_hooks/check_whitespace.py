@@ -2,15 +2,26 @@ from __future__ import annotations
 
 import logging
 import os
+import re
 import sys
-from pathlib import Path
 
 import rich_click as click
-from rich import print
 from rich.text import Text
 
+from heartfelt_hooks._fail_fast import ErrorLimit
+from heartfelt_hooks._fail_fast import fail_fast_options
+from heartfelt_hooks._git import staged_option
 from heartfelt_hooks._logging import VERBOSITY
 from heartfelt_hooks._logging import logger
+from heartfelt_hooks._paths import basename
+from heartfelt_hooks._paths import check_paths
+from heartfelt_hooks._paths import iter_chunks
+from heartfelt_hooks._paths import log_summary
+from heartfelt_hooks._profile import Profiler
+from heartfelt_hooks._profile import profile_options
+from heartfelt_hooks._progress import Progress
+
+_WHITESPACE = re.compile(r"\s")
 
 
 @click.command()
@@ -25,40 +36,41 @@ from heartfelt_hooks._logging import logger
     "-v", "--verbose", count=True, help="Also emit status messages to stderr."
 )
 @click.option("--file", help="Read files names from a file.", type=click.File("r"))
+@staged_option
+@fail_fast_options
+@profile_options
 @click.argument("files", nargs=-1, type=click.Path(exists=True))
-def check_whitespace(silent, verbose, file, files) -> None:
+def check_whitespace(
+    silent, verbose, file, staged, fail_fast, max_errors, profile, profile_output, files
+) -> None:
     logger.setLevel(VERBOSITY.get(verbose, logging.DEBUG))
     if silent:
         logger.setLevel(logging.ERROR)
 
-    if file:
-        files += tuple(file.read().splitlines())
-
-    error_count = 0
-    for filepath in (Path(f) for f in files):
-        logger.info(f"checking: {filepath}")
+    with (
+        Profiler.from_options(profile, profile_output) as profiler,
+        Progress.from_options(
+            silent, total=len(files) if files and not file else None
+        ) as progress,
+    ):
+        checked, error_count = check_paths(
+            iter_chunks(files, file=file, staged=staged),
+            _has_whitespace,
+            render=_highlight_whitespace,
+            limit=ErrorLimit.from_options(fail_fast, max_errors),
+            profiler=profiler,
+            progress=progress,
+        )
 
-        text = Text(filepath.name)
-        if text.highlight_regex(r"\s+", style="white on red"):
-            error_count += 1
-            print(Text(str(filepath.parent) + os.sep) + text)
+    log_summary(checked, error_count)
+    sys.exit(error_count)
 
-            if verbose:
-                logger.warning(filepath)
 
-    summary = os.linesep.join(
-        [
-            "Summary:",
-            f"checked {len(files)} filename{'s' if len(files) != 1 else ''}",
-            f"found {error_count} bad filename{'s' if error_count != 1 else ''}",
-        ]
-    )
+def _has_whitespace(filepath):
+    return _WHITESPACE.search(basename(filepath)) is not None
 
-    if error_count:
-        logger.warning(summary)
-        logger.error("💔")
-    else:
-        logger.info(summary)
-        logger.info("❤️")
 
-    sys.exit(error_count)
+def _highlight_whitespace(filepath):
+    text = Text(filepath.name)
+    text.highlight_regex(r"\s+", style="white on red")
+    return Text(str(filepath.parent) + os.sep) + text
@@ -1,14 +1,33 @@
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
 import logging
 import os
 import sys
+import textwrap
+from collections import defaultdict
+from contextlib import closing
+from pathlib import Path
 
 import nbformat
 import rich_click as click
+from nbformat.v4.nbjson import BytesEncoder
+from nbformat.v4.rwbase import split_lines
+from nbformat.v4.rwbase import strip_transient
 
+from heartfelt_hooks._fail_fast import ErrorLimit
+from heartfelt_hooks._fail_fast import fail_fast_options
 from heartfelt_hooks._logging import VERBOSITY
 from heartfelt_hooks._logging import logger
+from heartfelt_hooks._pipeline import Writer
+from heartfelt_hooks._pipeline import imap
+from heartfelt_hooks._pipeline import jobs_option
+from heartfelt_hooks._profile import NullProfiler
+from heartfelt_hooks._profile import Profiler
+from heartfelt_hooks._profile import profile_options
+from heartfelt_hooks._progress import Progress
 
 HIDDEN_CODE_CELL_FORMAT = """
 <details>
@@ -20,6 +39,8 @@ HIDDEN_CODE_CELL_FORMAT = """
 </details>
 """.strip()
 
+WIDGET_MIME_TYPE = "application/vnd.jupyter.widget-view+json"
+
 
 class Success:
     def __init__(self, filepath, cells):
@@ -62,9 +83,60 @@ class MissingTaggedCellError(Exception):
     "-v", "--verbose", count=True, help="Also emit status messages to stderr."
 )
 @click.option("--tags-to-hide", multiple=True, help="Hide cells with this tag.")
+@click.option(
+    "--variant",
+    "variants",
+    multiple=True,
+    metavar="NAME=TAG[,TAG...]",
+    callback=lambda ctx, param, value: _parse_variants(value),
+    help=(
+        "Also write <stem>-NAME.ipynb with the cells tagged with any of TAGs hidden."
+        " May be repeated to write several variants from a single read."
+    ),
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, writable=True),
+    help="Where to write variants [default: next to each notebook].",
+)
+@click.option(
+    "--max-output-size",
+    type=click.IntRange(min=0),
+    help="Truncate text, and drop other, outputs larger than this many characters.",
+)
+@click.option(
+    "--strip-widgets", is_flag=True, help="Remove ipywidgets state and views."
+)
+@click.option(
+    "--dedupe-images",
+    is_flag=True,
+    help=(
+        "Replace repeats of an image with a note of its hash and the cell that"
+        " first shows it. The repeats are removed from the written notebooks."
+    ),
+)
 @click.option("--file", help="Read files names from a file.", type=click.File("r"))
+@jobs_option
+@fail_fast_options
+@profile_options
 @click.argument("files", nargs=-1, type=click.Path(exists=True))
-def hide_solution_cells(silent, verbose, file, tags_to_hide, files) -> None:
+def hide_solution_cells(
+    silent,
+    verbose,
+    file,
+    tags_to_hide,
+    variants,
+    output_dir,
+    max_output_size,
+    strip_widgets,
+    dedupe_images,
+    jobs,
+    fail_fast,
+    max_errors,
+    profile,
+    profile_output,
+    files,
+) -> None:
     logger.setLevel(VERBOSITY.get(verbose, logging.DEBUG))
     if silent:
         logger.setLevel(logging.ERROR)
@@ -73,56 +145,164 @@ def hide_solution_cells(silent, verbose, file, tags_to_hide, files) -> None:
         files += tuple(file.read().splitlines())
     tags_to_hide = set(tags_to_hide)
 
-    if not tags_to_hide or not files:
+    strip = {
+        "max_size": max_output_size,
+        "widgets": strip_widgets,
+        "dedupe_images": dedupe_images,
+    }
+
+    if not (tags_to_hide or variants or _strips(**strip)) or not files:
         logger.info("nothing to do")
         sys.exit(0)
 
-    logger.info(
-        os.linesep.join(
-            [
-                f"hiding code cells with tags: {', '.join(tags_to_hide)}",
-                HIDDEN_CODE_CELL_FORMAT,
-            ]
-        )
-    )
+    _log_plan(tags_to_hide, variants)
+    if output_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    limit = ErrorLimit.from_options(fail_fast, max_errors)
+
     error_count = 0
-    for filepath in files:
-        logger.info(f"checking: {filepath}")
+    with (
+        Profiler.from_options(profile, profile_output) as profiler,
+        Writer(background=jobs != 1) as writer,
+        Progress.from_options(silent, total=len(files)) as progress,
+        closing(
+            imap(
+                files,
+                _hide_cells_in_source,
+                jobs=jobs,
+                profiler=profiler,
+                progress=progress,
+                tags_to_hide=tags_to_hide,
+                variants=variants,
+                strip=strip,
+            )
+        ) as file_results,
+    ):
+        for filepath, results in progress.track(file_results):
+            logger.info("checking: %s", filepath)
+
+            error_count += _write_results(
+                filepath, results, writer, profiler, output_dir=output_dir
+            )
+            if limit.reached(error_count):
+                logger.warning("stopping after %d errors", error_count)
+                break
 
-        nb = nbformat.read(filepath, as_version=4)
+    if error_count:
+        logger.error("💔")
+    else:
+        logger.info("❤️")
+
+    sys.exit(error_count)
+
+
+def _log_plan(tags_to_hide, variants):
+    if tags_to_hide:
+        logger.info(
+            os.linesep.join(
+                [
+                    f"hiding code cells with tags: {', '.join(tags_to_hide)}",
+                    HIDDEN_CODE_CELL_FORMAT,
+                ]
+            )
+        )
+    for name, tags in variants.items():
+        logger.info(
+            f"writing variant {name!r} hiding cells with tags: {', '.join(tags)}"
+        )
 
-        try:
-            cells = _hide_cells(nb.cells, tags_to_hide=tags_to_hide)
-        except MissingTaggedCellError as error:
-            status = Failure(filepath, error=str(error))
-            success = False
-        else:
-            status = Success(filepath, cells)
-            success = True
 
+def _write_results(filepath, results, writer, profiler, output_dir=None):
+    error_count = 0
+    for name, status, success, text in results:
         if success:
             logger.info(status)
         else:
             logger.warning(status)
             error_count += 1
 
-        nbformat.write(nb, sys.stdout)
-
-    if error_count:
-        logger.error("💔")
+        with profiler.phase(filepath, "write"):
+            if name is None:
+                writer.write(text)
+            else:
+                writer.write(text, _variant_path(filepath, name, output_dir))
+
+    return error_count
+
+
+def _hide_cells_in_source(
+    filepath,
+    source,
+    tags_to_hide=(),
+    variants=None,
+    strip=None,
+    profiler=None,
+):
+    profiler = profiler or NullProfiler()
+
+    with profiler.phase(filepath, "parse"):
+        nb = nbformat.reads(source, as_version=4)
+        index = _index_tags(nb.cells)
+
+    strip = strip or {}
+    with profiler.phase(filepath, "strip"):
+        _strip_outputs(nb, max_size=strip.get("max_size"), widgets=strip.get("widgets"))
+        # images are deduplicated for each notebook written, once its cells are
+        # hidden, so that a repeat never refers to the output of a hidden cell
+        images = _index_images(nb.cells) if strip.get("dedupe_images") else None
+
+    results = []
+    if variants:
+        writer = _VariantWriter(nb)
+        for name, tags in variants.items():
+            cells = {
+                count: copy.deepcopy(nb.cells[count]) for count in index.cells(tags)
+            }
+            with profiler.phase(filepath, "hide"):
+                status, success = _hide_and_report(
+                    f"{filepath!s} ({name})", list(cells.values()), tags
+                )
+            if images is not None:
+                with profiler.phase(filepath, "strip"):
+                    repeats = _repeated_images(images, hidden=cells)
+                    for count, outputs in repeats.items():
+                        cell = cells.setdefault(count, copy.deepcopy(nb.cells[count]))
+                        _replace_images(cell, outputs)
+            with profiler.phase(filepath, "serialize"):
+                results.append((name, status, success, writer.writes(cells)))
+
+    if tags_to_hide or not variants:
+        with profiler.phase(filepath, "hide"):
+            if tags_to_hide:
+                status, success = _hide_and_report(
+                    filepath, nb.cells, tags_to_hide, index=index
+                )
+            else:
+                status, success = Success(filepath, []), True
+        if images is not None:
+            with profiler.phase(filepath, "strip"):
+                hidden = index.cells(tags_to_hide) if tags_to_hide else ()
+                for count, outputs in _repeated_images(images, hidden).items():
+                    _replace_images(nb.cells[count], outputs)
+        with profiler.phase(filepath, "serialize"):
+            results.append((None, status, success, nbformat.writes(nb)))
+
+    return results
+
+
+def _hide_and_report(filepath, cells, tags_to_hide, index=None):
+    try:
+        hidden = _hide_cells(cells, tags_to_hide=tags_to_hide, index=index)
+    except MissingTaggedCellError as error:
+        return Failure(filepath, error=str(error)), False
     else:
-        logger.info("❤️")
+        return Success(filepath, hidden), True
 
-    sys.exit(error_count)
 
+def _hide_cells(cells, tags_to_hide=("solution",), index=None):
+    index = _index_tags(cells) if index is None else index
 
-def _hide_cells(cells, tags_to_hide=("solution",)):
-    tags_to_hide = set(tags_to_hide)
-    tagged_cells = []
-    for cell in cells:
-        tags = set(cell.get("metadata", {}).get("tags", []))
-        if tags & tags_to_hide:
-            tagged_cells.append(_hide_cell(cell))
+    tagged_cells = [_hide_cell(cells[count]) for count in index.cells(tags_to_hide)]
 
     if not tagged_cells:
         raise MissingTaggedCellError(tags_to_hide)
@@ -130,6 +310,226 @@ def _hide_cells(cells, tags_to_hide=("solution",)):
     return tagged_cells
 
 
+def _strips(max_size=None, widgets=False, dedupe_images=False):
+    """Whether the ``--max-output-size``, ``--strip-widgets`` or
+    ``--dedupe-images`` options strip anything."""
+    return max_size is not None or widgets or dedupe_images
+
+
+def _strip_outputs(nb, max_size=None, widgets=False):
+    """Remove bulky outputs from a notebook, in place.
+
+    Parameters
+    ----------
+    nb : NotebookNode
+        The notebook.
+    max_size : int, optional
+        Truncate stream outputs, and drop other outputs, with more than this
+        many characters.
+    widgets : bool, optional
+        Remove saved widget state and widget views.
+    """
+    if widgets:
+        nb.metadata.pop("widgets", None)
+
+    if max_size is not None or widgets:
+        for cell in nb.cells:
+            if cell.get("cell_type") == "code":
+                cell["outputs"] = _strip_cell_outputs(cell, max_size, widgets)
+
+
+def _strip_cell_outputs(cell, max_size=None, widgets=False):
+    outputs = []
+    for output in cell.get("outputs", []):
+        if output.get("output_type") == "stream":
+            if max_size is not None and len(output.text) > max_size:
+                output.text = output.text[:max_size] + "\n... [output truncated]\n"
+        elif "data" in output:
+            _strip_data(output, max_size, widgets)
+            if not output.data:
+                continue
+        outputs.append(output)
+    return outputs
+
+
+def _strip_data(output, max_size=None, widgets=False):
+    for mime_type in list(output.data):
+        payload = _payload(output.data[mime_type])
+        if (widgets and mime_type == WIDGET_MIME_TYPE) or (
+            max_size is not None and len(payload) > max_size
+        ):
+            _pop_data(output, mime_type)
+
+
+def _index_images(cells):
+    """Hash the images in the outputs of code cells.
+
+    Returns
+    -------
+    list of tuple of (int, int, str, str)
+        The cell, output, mime type and hash of each image, in order.
+    """
+    images = []
+    for count, cell in enumerate(cells):
+        if cell.get("cell_type") != "code":
+            continue
+        for index, output in enumerate(cell.get("outputs", [])):
+            for mime_type, payload in output.get("data", {}).items():
+                if mime_type.startswith("image/"):
+                    key = hashlib.sha1(_payload(payload).encode()).hexdigest()
+                    images.append((count, index, mime_type, key))
+    return images
+
+
+def _repeated_images(images, hidden=()):
+    """Find the images that repeat one shown by an earlier cell.
+
+    Parameters
+    ----------
+    images : list of tuple of (int, int, str, str)
+        The images of a notebook, from `_index_images`.
+    hidden : iterable of int, optional
+        Cells that are hidden, and so don't show their images.
+
+    Returns
+    -------
+    dict of int to list of tuple of (int, str, int, str)
+        The output, mime type, first cell to show it and hash, of each
+        repeat, by cell.
+
+    Examples
+    --------
+    >>> from heartfelt_hooks.hide_solution_cells import _repeated_images
+    >>> images = [(0, 0, "image/png", "a"), (2, 0, "image/png", "a")]
+    >>> _repeated_images(images)
+    {2: [(0, 'image/png', 0, 'a')]}
+    >>> _repeated_images(images, hidden=[0])
+    {}
+    """
+    hidden = set(hidden)
+
+    first_seen, repeats = {}, defaultdict(list)
+    for count, index, mime_type, key in images:
+        if count in hidden:
+            continue
+        if key in first_seen:
+            repeats[count].append((index, mime_type, first_seen[key], key))
+        else:
+            first_seen[key] = count
+    return dict(repeats)
+
+
+def _replace_images(cell, repeats):
+    """Replace images of a cell with a note of their hash, and of the cell that
+    first shows them, which stays findable by the hash if cells move.
+    """
+    for index, mime_type, first_seen, key in repeats:
+        output = cell["outputs"][index]
+        output["data"]["text/plain"] = (
+            f"<{mime_type} sha1:{key[:12]}: removed repeat of the output of cell"
+            f" {first_seen}>"
+        )
+        _pop_data(output, mime_type)
+
+
+def _payload(payload):
+    return payload if isinstance(payload, str) else json.dumps(payload)
+
+
+def _pop_data(output, mime_type):
+    output["data"].pop(mime_type)
+    output.get("metadata", {}).pop(mime_type, None)
+
+
+class _TagIndex(defaultdict):
+    """Map each tag to the indices of the cells tagged with it."""
+
+    def __init__(self):
+        super().__init__(list)
+
+    def cells(self, tags):
+        """Indices, in order, of the cells tagged with any of *tags*."""
+        return sorted(set().union(*(self.get(tag, ()) for tag in tags)))
+
+
+def _index_tags(cells):
+    index = _TagIndex()
+    for count, cell in enumerate(cells):
+        for tag in set(cell.get("metadata", {}).get("tags", [])):
+            index[tag].append(count)
+    return index
+
+
+class _VariantWriter:
+    """Serialize variants of a notebook, reusing the text of unchanged cells."""
+
+    def __init__(self, nb):
+        self._cells = nb.cells
+        self._head = nbformat.writes(nbformat.from_dict({**nb, "cells": []}))
+        self._fragments = {}
+
+    def writes(self, replacements):
+        """Serialize the notebook with some of its cells replaced.
+
+        Parameters
+        ----------
+        replacements : dict of int to NotebookNode
+            Cells to use in place of the notebook's own cells, by index.
+
+        Returns
+        -------
+        str
+            The notebook as JSON, the same as ``nbformat.writes`` would give.
+        """
+        if not self._cells:
+            return self._head
+
+        fragments = []
+        for count, cell in enumerate(self._cells):
+            if count in replacements:
+                fragments.append(_writes_cell(replacements[count]))
+            else:
+                if count not in self._fragments:
+                    self._fragments[count] = _writes_cell(cell)
+                fragments.append(self._fragments[count])
+
+        cells = '"cells": [\n' + ",\n".join(fragments) + "\n ]"
+        return self._head.replace('"cells": []', cells, 1)
+
+
+def _writes_cell(cell):
+    nb = nbformat.from_dict({"cells": [copy.deepcopy(cell)], "metadata": {}})
+    cell = strip_transient(split_lines(nb)).cells[0]
+
+    text = json.dumps(
+        cell,
+        cls=BytesEncoder,
+        indent=1,
+        sort_keys=True,
+        separators=(",", ": "),
+        ensure_ascii=False,
+    )
+    return textwrap.indent(text, "  ")
+
+
+def _variant_path(filepath, name, output_dir=None):
+    filepath = Path(filepath)
+    return (
+        Path(output_dir or filepath.parent) / f"{filepath.stem}-{name}{filepath.suffix}"
+    )
+
+
+def _parse_variants(values):
+    variants = {}
+    for value in values:
+        name, sep, tags = value.partition("=")
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+        if not sep or not name or not tags:
+            raise click.BadParameter(f"{value!r}: expected NAME=TAG[,TAG...]")
+        variants[name] = tags
+    return variants
+
+
 def _hide_cell(cell):
     if cell["cell_type"] == "code":
         cell["cell_type"] = "markdown"
@@ -3,15 +3,34 @@ from __future__ import annotations
 import logging
 import os
 import sys
+from contextlib import closing
 from pathlib import Path
 
 import nbformat
 import rich_click as click
 from rich import print
+from rich.text import Text
 
+from heartfelt_hooks._cache import ParseStore
+from heartfelt_hooks._cache import cache_option
+from heartfelt_hooks._fail_fast import ErrorLimit
+from heartfelt_hooks._fail_fast import fail_fast_options
+from heartfelt_hooks._git import staged_option
 from heartfelt_hooks._logging import VERBOSITY
 from heartfelt_hooks._logging import logger
+from heartfelt_hooks._pipeline import Writer
+from heartfelt_hooks._pipeline import imap
+from heartfelt_hooks._pipeline import jobs_option
+from heartfelt_hooks._pipeline import split_jobs
+from heartfelt_hooks._profile import NullProfiler
+from heartfelt_hooks._profile import Profiler
+from heartfelt_hooks._profile import profile_options
+from heartfelt_hooks._progress import Progress
+from heartfelt_hooks._toc import render_toc
 from heartfelt_hooks.check_heading_levels import NotebookHeadings
+from heartfelt_hooks.check_heading_levels import cached_headings
+from heartfelt_hooks.check_heading_levels import staged_headings
+from heartfelt_hooks.check_heading_levels import staged_notebooks
 
 
 class MissingTOCError(Exception):
@@ -53,21 +72,72 @@ class Failure:
     "-v", "--verbose", count=True, help="Also emit status messages to stderr."
 )
 @click.option("--file", help="Read files names from a file.", type=click.File("r"))
+@click.option(
+    "--max-depth",
+    type=click.IntRange(min=1),
+    help="Only list headings this many levels deep.",
+)
+@staged_option
+@cache_option
+@jobs_option
+@profile_options
 @click.argument("files", nargs=-1, type=click.Path(exists=True))
-def list_headings(silent, verbose, file, files) -> None:
+def list_headings(
+    silent,
+    verbose,
+    file,
+    max_depth,
+    staged,
+    cache,
+    jobs,
+    profile,
+    profile_output,
+    files,
+) -> None:
     logger.setLevel(VERBOSITY.get(verbose, logging.DEBUG))
     if silent:
         logger.setLevel(logging.ERROR)
 
     if file:
         files += tuple(file.read().splitlines())
-
-    for filepath in (Path(f) for f in files):
-        logger.info(f"checking: {filepath}")
-
-        headings = NotebookHeadings(filepath, cells_to_ignore=["toc"])
-
-        print(headings)
+    if staged and not files:
+        files = staged_notebooks()
+
+    file_jobs, cell_jobs = split_jobs(files, jobs)
+    store = ParseStore.open() if cache else None
+
+    with (
+        Profiler.from_options(profile, profile_output) as profiler,
+        Progress.from_options(silent, total=len(files)) as progress,
+    ):
+        if staged:
+            results = (
+                (filepath, render_toc(_as_toc_entries(headings), max_depth=max_depth))
+                for filepath, headings in staged_headings(
+                    files,
+                    cells_to_ignore=["toc"],
+                    jobs=jobs,
+                    store=store,
+                    profiler=profiler,
+                )
+            )
+        else:
+            results = imap(
+                (Path(f) for f in files),
+                _list_headings_in_source,
+                jobs=file_jobs,
+                profiler=profiler,
+                progress=progress,
+                cell_jobs=cell_jobs,
+                max_depth=max_depth,
+                store=store,
+            )
+
+        for filepath, toc in progress.track(results):
+            logger.info("checking: %s", filepath)
+
+            with profiler.phase(filepath, "render"):
+                print(Text(toc))
 
     logger.info("❤️")
 
@@ -96,8 +166,31 @@ def list_headings(silent, verbose, file, files) -> None:
     is_flag=True,
     help="Overwrite the existing notebook",
 )
+@click.option(
+    "--max-depth",
+    type=click.IntRange(min=1),
+    help="Only include headings this many levels deep in the table of contents.",
+)
+@cache_option
+@jobs_option
+@fail_fast_options
+@profile_options
 @click.argument("files", nargs=-1, type=click.Path(exists=True))
-def insert_toc(silent, verbose, allow_missing_toc, file, in_place, files) -> None:
+def insert_toc(
+    silent,
+    verbose,
+    allow_missing_toc,
+    file,
+    in_place,
+    max_depth,
+    cache,
+    jobs,
+    fail_fast,
+    max_errors,
+    profile,
+    profile_output,
+    files,
+) -> None:
     logger.setLevel(VERBOSITY.get(verbose, logging.DEBUG))
     if silent:
         logger.setLevel(logging.ERROR)
@@ -105,35 +198,54 @@ def insert_toc(silent, verbose, allow_missing_toc, file, in_place, files) -> Non
     if file:
         files += tuple(file.read().splitlines())
 
-    error_count = 0
-    for filepath in files:
-        logger.info(f"checking: {filepath!s}")
-
-        headings = NotebookHeadings(filepath, cells_to_ignore=["toc"])
+    file_jobs, cell_jobs = split_jobs(files, jobs)
+    limit = ErrorLimit.from_options(fail_fast, max_errors)
 
-        try:
-            cell_no, cell = _insert_toc(headings.nb.cells, str(headings))
-        except MissingTOCError as error:
-            status = Failure(filepath, error=str(error))
-            success = False or allow_missing_toc
-        else:
-            status = Success(filepath, cell_no=cell_no, contents=cell["source"])
-            logger.info(f"min_level: {headings.min_level}")
-            logger.info(f"first_level: {headings.first_level}")
-            success = True
-
-        if success:
-            logger.info(status)
-        else:
-            logger.warning(status)
-            error_count += 1
+    error_count = 0
+    with (
+        Profiler.from_options(profile, profile_output) as profiler,
+        Writer(background=file_jobs != 1) as writer,
+        Progress.from_options(silent, total=len(files)) as progress,
+        closing(
+            imap(
+                files,
+                _insert_toc_in_source,
+                jobs=file_jobs,
+                profiler=profiler,
+                progress=progress,
+                cell_jobs=cell_jobs,
+                max_depth=max_depth,
+                store=ParseStore.open() if cache else None,
+            )
+        ) as results,
+    ):
+        for filepath, (status, levels, text) in progress.track(results):
+            logger.info("checking: %s", filepath)
+
+            if levels is None:
+                success = False or allow_missing_toc
+            else:
+                logger.info(f"min_level: {levels[0]}")
+                logger.info(f"first_level: {levels[1]}")
+                success = True
 
-        if in_place:
             if success:
-                logger.info(f"{filepath!s}: overwriting")
-                nbformat.write(headings.nb, filepath)
-        else:
-            nbformat.write(headings.nb, sys.stdout)
+                logger.info(status)
+            else:
+                logger.warning(status)
+                error_count += 1
+
+            with profiler.phase(filepath, "write"):
+                if in_place:
+                    if success:
+                        logger.info(f"{filepath!s}: overwriting")
+                        writer.write(text, filepath)
+                else:
+                    writer.write(text)
+
+            if limit.reached(error_count):
+                logger.warning("stopping after %d errors", error_count)
+                break
 
     if error_count:
         logger.error("💔")
@@ -143,6 +255,61 @@ def insert_toc(silent, verbose, allow_missing_toc, file, in_place, files) -> Non
     sys.exit(error_count)
 
 
+def _as_toc_entries(headings):
+    return [(heading.level, heading.text) for _, heading in headings]
+
+
+def _list_headings_in_source(
+    filepath, source, cell_jobs=1, max_depth=None, store=None, profiler=None
+):
+    profiler = profiler or NullProfiler()
+
+    with profiler.phase(filepath, "parse"):
+        headings = cached_headings(
+            source,
+            cells_to_ignore=["toc"],
+            jobs=cell_jobs,
+            store=store,
+            filepath=filepath,
+        )
+
+    with profiler.phase(filepath, "render"):
+        return render_toc(_as_toc_entries(headings), max_depth=max_depth)
+
+
+def _insert_toc_in_source(
+    filepath, source, cell_jobs=1, max_depth=None, store=None, profiler=None
+):
+    profiler = profiler or NullProfiler()
+
+    with profiler.phase(filepath, "parse"):
+        nb = nbformat.reads(source, as_version=4)
+        headings = NotebookHeadings(
+            filepath,
+            nb=nb,
+            headings=cached_headings(
+                source, cells_to_ignore=["toc"], nb=nb, jobs=cell_jobs, store=store
+            ),
+        )
+
+    try:
+        with profiler.phase(filepath, "render"):
+            cell_no, cell = _insert_toc(
+                headings.nb.cells, headings.toc(max_depth=max_depth)
+            )
+    except MissingTOCError as error:
+        status = Failure(filepath, error=str(error))
+        levels = None
+    else:
+        status = Success(filepath, cell_no=cell_no, contents=cell["source"])
+        levels = headings.min_level, headings.first_level
+
+    with profiler.phase(filepath, "serialize"):
+        text = nbformat.writes(headings.nb)
+
+    return status, levels, text
+
+
 def _insert_toc(cells, toc):
     count, cell = _find_toc_cell(cells)
 
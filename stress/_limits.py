@@ -0,0 +1,86 @@
+"""Measure the runtime and peak memory of the hooks."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+BASE_SECONDS = 5.0
+"""Allowance for starting a hook, whatever the size of its input."""
+
+BASE_MEGABYTES = 100.0
+"""Allowance for the memory used by the interpreter and imports."""
+
+_RSS_UNITS = 1 if sys.platform == "darwin" else 1024
+
+
+class Limit(NamedTuple):
+    """Runtime and peak memory allowed for a hook, at a scale of 1.0."""
+
+    seconds: float
+    megabytes: float
+
+    def check(self, usage, scale):
+        """Fail if *usage* is over the limit for *scale*."""
+        seconds = BASE_SECONDS + self.seconds * scale
+        megabytes = BASE_MEGABYTES + self.megabytes * scale
+
+        assert "Traceback" not in usage.stderr, usage.stderr
+        assert usage.seconds <= seconds, f"{usage.seconds:.1f}s > {seconds:.1f}s"
+        assert (
+            usage.megabytes <= megabytes
+        ), f"{usage.megabytes:.0f}MB > {megabytes:.0f}MB"
+
+
+class Usage(NamedTuple):
+    """What a run of a hook used."""
+
+    returncode: int
+    seconds: float
+    megabytes: float
+    stderr: str
+
+
+def run_hook(command, *args, cwd=None):
+    """Run a hook in a new process, and measure its runtime and peak RSS.
+
+    Parameters
+    ----------
+    command : str
+        Name of the hook's console script.
+    *args : str
+        Arguments for the hook.
+    cwd : path, optional
+        Directory to run the hook in.
+
+    Returns
+    -------
+    Usage
+        The exit code, runtime, peak RSS and standard error of the hook.
+    """
+    script = shutil.which(command, path=Path(sys.executable).parent) or command
+
+    with tempfile.TemporaryFile("w+") as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [script, *args], cwd=cwd, stdout=subprocess.DEVNULL, stderr=stderr
+        )
+        # wait4, unlike getrusage(RUSAGE_CHILDREN), gives the usage of this
+        # process alone rather than the largest of all finished children.
+        _, status, rusage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        stderr.seek(0)
+        return Usage(
+            returncode=process.returncode,
+            seconds=seconds,
+            megabytes=rusage.ru_maxrss * _RSS_UNITS / 1e6,
+            stderr=stderr.read(),
+        )
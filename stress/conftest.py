@@ -0,0 +1,32 @@
+"""Run the hooks on pathological inputs, within limits on runtime and memory.
+
+The size of the inputs is set by ``--scale`` (or ``HEARTFELT_STRESS_SCALE``),
+1.0 being the full size, for example::
+
+    $ nox -s stress
+    $ nox -s stress -- --scale 0.1
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--scale",
+        type=float,
+        default=float(os.environ.get("HEARTFELT_STRESS_SCALE", 1.0)),
+        help="Size of the generated inputs, relative to the full size.",
+    )
+
+
+@pytest.fixture(scope="session")
+def scale(request):
+    return request.config.getoption("scale")
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+from _limits import Limit
+from _limits import run_hook
+from _notebooks import make_paths
+from _notebooks import write_notebook
+
+NOTEBOOKS = {
+    # a long notebook where every markdown cell is a heading
+    "cells": {"n_cells": 100_000, "markdown_size": 50, "heading_density": 1.0},
+    # half a gigabyte of image outputs
+    "outputs": {"n_cells": 1_000, "markdown_size": 200, "output_size": 1_000_000},
+    # lists and block quotes nested a hundred levels deep in every markdown cell
+    "nesting": {"n_cells": 2_000, "markdown_size": 200, "nesting": 100},
+}
+
+PATHS = 1_000_000
+
+NOTEBOOK_HOOKS = {
+    "check-heading-levels": (),
+    "list-headings": (),
+    "insert-toc": (),
+    "hide-solution-cells": ("--tags-to-hide", "solution"),
+}
+
+FILENAME_HOOKS = ("check-whitespace", "check-mixed-case", "check-snake-case")
+
+LIMITS = {
+    ("cells", "check-heading-levels"): Limit(seconds=20, megabytes=250),
+    ("cells", "list-headings"): Limit(seconds=35, megabytes=250),
+    ("cells", "insert-toc"): Limit(seconds=45, megabytes=850),
+    ("cells", "hide-solution-cells"): Limit(seconds=40, megabytes=900),
+    ("outputs", "check-heading-levels"): Limit(seconds=10, megabytes=1_500),
+    ("outputs", "list-headings"): Limit(seconds=10, megabytes=1_500),
+    ("outputs", "insert-toc"): Limit(seconds=20, megabytes=3_000),
+    ("outputs", "hide-solution-cells"): Limit(seconds=20, megabytes=4_800),
+    ("nesting", "check-heading-levels"): Limit(seconds=50, megabytes=100),
+    ("nesting", "list-headings"): Limit(seconds=50, megabytes=100),
+    ("nesting", "insert-toc"): Limit(seconds=50, megabytes=150),
+    ("nesting", "hide-solution-cells"): Limit(seconds=5, megabytes=150),
+    "check-whitespace": Limit(seconds=40, megabytes=200),
+    "check-mixed-case": Limit(seconds=15, megabytes=200),
+    "check-snake-case": Limit(seconds=10, megabytes=200),
+}
+"""Runtime and peak memory, above the base allowance, of each hook on each input."""
+
+
+@pytest.fixture(scope="module", params=NOTEBOOKS)
+def notebook(request, tmp_path_factory, scale):
+    params = dict(NOTEBOOKS[request.param])
+    params["n_cells"] = max(2, int(params["n_cells"] * scale))
+
+    filepath = tmp_path_factory.mktemp(request.param) / "notebook.ipynb"
+    write_notebook(filepath, **params)
+
+    return request.param, filepath
+
+
+@pytest.fixture(scope="module")
+def manifest(tmp_path_factory, scale):
+    filepath = tmp_path_factory.mktemp("paths") / "manifest.txt"
+    filepath.write_text(os.linesep.join(make_paths(max(1, int(PATHS * scale)))))
+
+    return filepath
+
+
+@pytest.mark.parametrize("hook", NOTEBOOK_HOOKS)
+def test_notebook_hook(notebook, hook, scale):
+    name, filepath = notebook
+
+    usage = run_hook(
+        hook,
+        "--silent",
+        "--no-cache",
+        *NOTEBOOK_HOOKS[hook],
+        filepath.name,
+        cwd=filepath.parent,
+    )
+    print(f"{name} {hook}: {usage.seconds:.1f}s {usage.megabytes:.0f}MB")
+
+    LIMITS[name, hook].check(usage, scale)
+
+
+@pytest.mark.parametrize("hook", FILENAME_HOOKS)
+def test_filename_hook(manifest, hook, scale):
+    usage = run_hook(hook, "--silent", "--file", str(manifest))
+    print(f"{hook}: {usage.seconds:.1f}s {usage.megabytes:.0f}MB")
+
+    LIMITS[hook].check(usage, scale)
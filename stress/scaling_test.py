@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import functools
+import gc
+import os
+import time
+
+import pytest
+from _notebooks import make_notebook
+from _notebooks import make_paths
+from click.testing import CliRunner
+
+from heartfelt_hooks.check_heading_levels import DedentValidator
+from heartfelt_hooks.check_heading_levels import IndentValidator
+from heartfelt_hooks.check_heading_levels import NotebookHeadings
+from heartfelt_hooks.check_heading_levels import OneAndOnlyOneLevelOneValidator
+from heartfelt_hooks.check_heading_levels import StartsWithLevelOneValidator
+from heartfelt_hooks.check_heading_levels import validate_filepath
+from heartfelt_hooks.check_mixed_case import check_mixed_case
+from heartfelt_hooks.check_snake_case import check_snake_case
+from heartfelt_hooks.check_whitespace import check_whitespace
+from heartfelt_hooks.hide_solution_cells import _hide_cells
+from heartfelt_hooks.list_headings import _insert_toc
+
+CELLS = 25_000
+PATHS = 100_000
+
+GROWTH = 4
+"""How many times larger the second input is than the first."""
+
+MAX_RATIO = 10.0
+"""Most that runtime may grow by, between the inputs; quadratic code gives 16.
+
+Linear code can grow by more than `GROWTH`, as larger inputs fit less well in
+the processor's caches.
+"""
+
+MIN_SECONDS = 0.2
+"""Shortest time to call a function for, so that fast functions time reliably."""
+
+VALIDATORS = (
+    IndentValidator,
+    DedentValidator,
+    StartsWithLevelOneValidator,
+    OneAndOnlyOneLevelOneValidator,
+)
+
+
+def _extract(cells, headings):
+    NotebookHeadings.extract({"cells": cells}, cells_to_ignore=["toc"])
+
+
+def _validate(validator):
+    def validate(cells, headings):
+        validate_filepath("notebook.ipynb", validators=[validator], headings=headings)
+
+    return validate
+
+
+def _insert(cells, headings):
+    _insert_toc(cells, os.linesep.join(f"* {heading.text}" for _, heading in headings))
+
+
+def _hide(cells, headings):
+    # _hide_cells replaces the items of the cells it hides, copying them is linear
+    _hide_cells([dict(cell) for cell in cells], tags_to_hide={"solution"})
+
+
+NOTEBOOK_FUNCS = {
+    "NotebookHeadings.extract": _extract,
+    **{validator.rule: _validate(validator) for validator in VALIDATORS},
+    "_insert_toc": _insert,
+    "_hide_cells": _hide,
+}
+
+
+@pytest.fixture(scope="module")
+def notebooks(scale):
+    n_cells = max(1_000, int(CELLS * scale))
+
+    notebooks = []
+    for size in (1, GROWTH):
+        nb = make_notebook(
+            n_cells=n_cells * size, markdown_size=50, heading_density=1.0
+        )
+        notebooks.append(
+            (nb.cells, NotebookHeadings.extract(nb, cells_to_ignore=["toc"]))
+        )
+    return notebooks
+
+
+@pytest.mark.parametrize("func", NOTEBOOK_FUNCS)
+def test_notebook_func_is_linear(func, notebooks):
+    small, large = (
+        _best_of(functools.partial(NOTEBOOK_FUNCS[func], cells, headings))
+        for cells, headings in notebooks
+    )
+
+    assert large / small < MAX_RATIO, f"{small:.4f}s -> {large:.4f}s"
+
+
+@pytest.mark.parametrize(
+    "command", (check_whitespace, check_mixed_case, check_snake_case)
+)
+def test_filename_check_is_linear(command, scale, tmp_path):
+    n_paths = max(10_000, int(PATHS * scale))
+    runner = CliRunner()
+
+    seconds = []
+    for size in (1, GROWTH):
+        manifest = tmp_path / f"manifest_{size}.txt"
+        manifest.write_text(os.linesep.join(make_paths(n_paths * size)))
+        seconds.append(
+            _best_of(
+                lambda manifest=manifest: runner.invoke(
+                    command, ["--silent", "--file", str(manifest)]
+                )
+            )
+        )
+    small, large = seconds
+
+    assert large / small < MAX_RATIO, f"{small:.4f}s -> {large:.4f}s"
+
+
+def _best_of(func, repeat=3):
+    """Best time per call of *func*, calling it for at least `MIN_SECONDS` a run.
+
+    As with timeit, garbage collection is disabled while timing, as its cost
+    depends on everything else that is in memory.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        seconds, calls = 0.0, 0
+        gc.disable()
+        try:
+            while seconds < MIN_SECONDS:
+                start = time.perf_counter()
+                func()
+                seconds += time.perf_counter() - start
+                calls += 1
+        finally:
+            gc.enable()
+        best = min(best, seconds / calls)
+    return best
@@ -0,0 +1,68 @@
+import nbformat
+import pytest
+
+import heartfelt_hooks
+from heartfelt_hooks import CheckResult
+from heartfelt_hooks import HeadingError
+
+
+@pytest.fixture
+def notebook():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_markdown_cell("## Title"),
+        nbformat.v4.new_code_cell("# not a heading"),
+        nbformat.v4.new_markdown_cell("#### Too deep\n\n# Too shallow"),
+    ]
+    return nb
+
+
+def test_check_all_rules(notebook):
+    [result] = heartfelt_hooks.check(notebook)
+
+    assert isinstance(result, CheckResult)
+    assert not result.ok
+    assert result.source == "<notebook 0>"
+    assert {error.rule for error in result.errors} == {"indent", "dedent", "first"}
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_check_sources(tmp_path, notebook, jobs):
+    filepath = tmp_path / "notebook.ipynb"
+    nbformat.write(notebook, filepath)
+
+    results = heartfelt_hooks.check(
+        [filepath, str(filepath), filepath.read_bytes(), notebook],
+        rules=["indent"],
+        jobs=jobs,
+    )
+
+    assert [result.source for result in results] == [
+        str(filepath),
+        str(filepath),
+        "<notebook 2>",
+        "<notebook 3>",
+    ]
+    expected = HeadingError(
+        rule="indent", cell=2, level=4, text="Too deep", ref_cell=0, ref_level=2
+    )
+    assert all(result.errors == (expected,) for result in results)
+
+
+def test_check_ok():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_markdown_cell("# Title\n## Section")]
+
+    assert heartfelt_hooks.check(nb)[0].ok
+
+
+def test_check_unknown_rule(notebook):
+    with pytest.raises(ValueError, match="unknown rules: foo"):
+        heartfelt_hooks.check(notebook, rules=["foo", "indent"])
+
+
+def test_results_are_slotted(notebook):
+    [result] = heartfelt_hooks.check(notebook)
+
+    assert not hasattr(result, "__dict__")
+    assert not hasattr(result.errors[0], "__dict__")
@@ -0,0 +1,156 @@
+import os
+import time
+
+import nbformat
+import pytest
+
+from heartfelt_hooks._cache import MAX_AGE
+from heartfelt_hooks._cache import PRUNE_INTERVAL
+from heartfelt_hooks._cache import ParsedNotebook
+from heartfelt_hooks._cache import ParseStore
+from heartfelt_hooks._cache import _generation
+from heartfelt_hooks._git import blob_sha
+from heartfelt_hooks._pipeline import _read
+from heartfelt_hooks._version import __version__
+from heartfelt_hooks.check_heading_levels import NotebookHeadings
+from heartfelt_hooks.check_heading_levels import cached_headings
+from heartfelt_hooks.check_heading_levels import parse_notebook
+
+
+@pytest.fixture
+def notebook():
+    toc = nbformat.v4.new_markdown_cell("# Table of Contents")
+    toc.metadata["tags"] = ["toc"]
+    solution = nbformat.v4.new_code_cell("# not a heading")
+    solution.metadata["tags"] = ["solution", "ünïcode"]
+
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        toc,
+        nbformat.v4.new_markdown_cell("# Title\n\nSome text\n\n## Sëction"),
+        solution,
+        nbformat.v4.new_raw_cell("raw"),
+        nbformat.v4.new_markdown_cell("### Sub-section"),
+    ]
+    return nb
+
+
+def test_parsed_notebook_round_trip(notebook):
+    parsed = ParsedNotebook(parse_notebook(notebook).to_bytes())
+
+    assert parsed.cell_types == ("markdown", "markdown", "code", "raw", "markdown")
+    assert parsed.tags == (("toc",), (), ("solution", "ünïcode"), (), ())
+    assert [parsed.source(cell) for cell in range(5)] == [
+        "# Table of Contents",
+        "# Title\n\nSome text\n\n## Sëction",
+        None,
+        None,
+        "### Sub-section",
+    ]
+    assert parsed.headings(cells_to_ignore=["toc"]) == [
+        (1, 1, "Title"),
+        (1, 2, "Sëction"),
+        (4, 3, "Sub-section"),
+    ]
+
+
+def test_parsed_notebook_bad_version():
+    with pytest.raises(ValueError):
+        ParsedNotebook(b"HHnb\xff" + bytes(16))
+
+
+def test_parse_store(tmp_path, notebook):
+    store = ParseStore(tmp_path)
+    parsed = parse_notebook(notebook)
+
+    assert "abcdef" not in store
+    assert store.get("abcdef") is None
+
+    store.put("abcdef", parsed)
+    assert "abcdef" in store
+    assert ParseStore(tmp_path).get("abcdef").to_bytes() == parsed.to_bytes()
+
+
+def test_parse_store_corrupt(tmp_path, notebook):
+    store = ParseStore(tmp_path)
+    store.put("abcdef", parse_notebook(notebook))
+    store._filepath("abcdef").write_bytes(b"HHnb")
+
+    assert store.get("abcdef") is None
+
+
+@pytest.mark.parametrize("cells_to_ignore", (None, ["toc"]))
+def test_cached_headings(tmp_path, notebook, cells_to_ignore):
+    source = nbformat.writes(notebook)
+    store = ParseStore(tmp_path)
+    expected = NotebookHeadings.extract(notebook, cells_to_ignore=cells_to_ignore)
+
+    headings = cached_headings(source, cells_to_ignore=cells_to_ignore, store=store)
+    assert headings == expected
+    assert blob_sha(source) in store
+
+    headings = cached_headings(
+        None, cells_to_ignore=cells_to_ignore, store=store, key=blob_sha(source)
+    )
+    assert headings == expected
+
+
+def test_cached_headings_of_working_tree(tmp_path, notebook, monkeypatch):
+    filepath = tmp_path / "crlf.ipynb"
+    filepath.write_bytes(nbformat.writes(notebook).replace("\n", "\r\n").encode())
+    store = ParseStore(tmp_path / "store")
+
+    expected = cached_headings(_read(filepath), store=store, filepath=filepath)
+
+    def parse_again(*args, **kwds):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(
+        "heartfelt_hooks.check_heading_levels.parse_notebook", parse_again
+    )
+    headings = cached_headings(_read(filepath), store=store, filepath=filepath)
+    assert headings == expected
+    assert len(list((tmp_path / "store").glob("parsed-v1/*/*/*"))) == 1
+
+
+def test_parse_store_is_versioned(tmp_path, notebook):
+    store = ParseStore(tmp_path)
+    store.put("abcdef", parse_notebook(notebook))
+
+    [filepath] = (tmp_path / "parsed-v1").glob("*/*/abcdef")
+    assert filepath.parent.parent.name == _generation()
+    assert __version__ in _generation()
+    assert "mistletoe" in _generation()
+
+
+def test_parse_store_prune(tmp_path, notebook):
+    store = ParseStore(tmp_path)
+    store.put("abcdef", parse_notebook(notebook))
+    store.put("123456", parse_notebook(notebook))
+    stale = tmp_path / "parsed-v1" / "0.0.1-mistletoe-0.1" / "ab" / "abcdef"
+    stale.parent.mkdir(parents=True)
+    stale.write_bytes(b"")
+
+    a_month_ago = time.time() - MAX_AGE - 60
+    os.utime(store._filepath("abcdef"), (a_month_ago, a_month_ago))
+    os.utime(store._filepath("123456"), (a_month_ago, a_month_ago))
+    assert store.get("123456") is not None
+
+    store.prune()
+
+    assert "abcdef" not in store
+    assert "123456" in store
+    assert not stale.exists()
+
+
+def test_parse_store_prune_interval(tmp_path, notebook):
+    store = ParseStore(tmp_path)
+    store.prune()
+    store.put("abcdef", parse_notebook(notebook))
+    os.utime(store._filepath("abcdef"), (0, 0))
+
+    store.prune(interval=PRUNE_INTERVAL)
+    assert "abcdef" in store
+
+    store.prune()
+    assert "abcdef" not in store
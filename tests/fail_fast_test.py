@@ -0,0 +1,69 @@
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from heartfelt_hooks._fail_fast import ErrorLimit
+from heartfelt_hooks.check_heading_levels import DedentValidator
+from heartfelt_hooks.check_heading_levels import Heading
+from heartfelt_hooks.check_heading_levels import IndentValidator
+from heartfelt_hooks.check_heading_levels import check_heading_levels
+from heartfelt_hooks.check_heading_levels import validate_filepath
+
+
+@pytest.mark.parametrize(
+    "fail_fast,max_errors,expected",
+    ((False, None, None), (False, 5, 5), (True, None, 1), (True, 5, 1)),
+)
+def test_limit_from_options(fail_fast, max_errors, expected):
+    assert ErrorLimit.from_options(fail_fast, max_errors).max_errors == expected
+
+
+@pytest.fixture
+def headings():
+    levels = (2, 4, 1, 5, 1, 6)
+    return [(count, Heading(level, f"H{count}")) for count, level in enumerate(levels)]
+
+
+def test_validate_filepath_finds_all_errors(headings):
+    errors = validate_filepath(
+        "notebook.ipynb",
+        validators=(IndentValidator, DedentValidator),
+        headings=headings,
+    )
+    assert len(errors) == 5
+
+
+@pytest.mark.parametrize("max_errors", (1, 3))
+def test_validate_filepath_skips_validators(headings, max_errors):
+    errors = validate_filepath(
+        "notebook.ipynb",
+        validators=(IndentValidator, DedentValidator),
+        headings=headings,
+        max_errors=max_errors,
+    )
+    assert errors == validate_filepath(
+        "notebook.ipynb", validators=(IndentValidator,), headings=headings
+    )
+
+
+@pytest.mark.parametrize("option", ("--fail-fast", "--max-errors=1"))
+def test_fix_is_not_stopped_by_fixes(tmp_path, option):
+    filepaths = [tmp_path / f"{name}.ipynb" for name in "abc"]
+    for filepath in filepaths:
+        nb = nbformat.v4.new_notebook()
+        nb.cells = [
+            nbformat.v4.new_markdown_cell("# Title"),
+            nbformat.v4.new_markdown_cell("### Too deep"),
+        ]
+        nbformat.write(nb, filepath)
+
+    result = CliRunner().invoke(
+        check_heading_levels,
+        ["--fix", option, "--no-cache", *(str(f) for f in filepaths)],
+    )
+
+    assert result.exit_code == 3
+    assert "stopping" not in result.output
+    for filepath in filepaths:
+        cells = nbformat.read(filepath, as_version=4).cells
+        assert cells[1].source == "## Too deep"
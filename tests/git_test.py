@@ -0,0 +1,136 @@
+import subprocess
+
+import nbformat
+import pytest
+from click.testing import CliRunner
+
+from heartfelt_hooks._git import blob_sha
+from heartfelt_hooks._git import cat_blobs
+from heartfelt_hooks._git import index_entries
+from heartfelt_hooks._git import staged_files
+from heartfelt_hooks.check_heading_levels import check_heading_levels
+from heartfelt_hooks.check_heading_levels import staged_notebooks
+from heartfelt_hooks.list_headings import list_headings
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q"], check=True)
+    for name, contents in [("a.txt", "foo"), ("b c.txt", "bar"), ("d.txt", "foo")]:
+        (tmp_path / name).write_text(contents)
+    subprocess.run(["git", "add", "."], check=True)
+    return tmp_path
+
+
+def test_staged_files(repo):
+    assert sorted(staged_files()) == ["a.txt", "b c.txt", "d.txt"]
+
+
+def test_staged_files_with_suffixes(repo):
+    (repo / "e.TXT").write_text("baz")
+    (repo / "f.md").write_text("# f")
+    subprocess.run(["git", "add", "."], check=True)
+
+    assert sorted(staged_files(suffixes=[".txt"])) == [
+        "a.txt",
+        "b c.txt",
+        "d.txt",
+        "e.TXT",
+    ]
+
+
+@pytest.mark.parametrize(
+    "hook,exit_code,expected",
+    (
+        (check_heading_levels, 1, "notebook.ipynb:level=1(cell=0):level=3(cell=1)"),
+        (list_headings, 0, "* [Too deep]"),
+    ),
+)
+def test_staged_skips_other_files(repo, hook, exit_code, expected):
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_markdown_cell("# Title"),
+        nbformat.v4.new_markdown_cell("### Too deep"),
+    ]
+    nbformat.write(nb, repo / "notebook.ipynb")
+    (repo / "README.txt").write_text("not a notebook")
+    subprocess.run(["git", "add", "."], check=True)
+
+    result = CliRunner().invoke(hook, ["--staged", "--no-cache"])
+
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+    assert result.exit_code == exit_code
+    assert expected in result.output
+    assert "README" not in result.output
+
+
+def test_index_entries(repo):
+    entries = index_entries(["./a.txt", "d.txt"])
+
+    assert sorted(entries) == ["a.txt", "d.txt"]
+    assert entries["a.txt"] == entries["d.txt"]
+
+
+def test_cat_blobs_reads_staged_version(repo):
+    (repo / "a.txt").write_text("changed")
+    entries = index_entries()
+
+    blobs = cat_blobs([entries["b c.txt"], entries["a.txt"], entries["d.txt"]])
+    assert list(blobs) == [b"bar", b"foo", b"foo"]
+
+
+def test_blob_sha(repo):
+    entries = index_entries()
+
+    assert blob_sha("foo") == entries["a.txt"]
+    assert blob_sha(b"bar") == entries["b c.txt"]
+
+
+@pytest.mark.parametrize("hook", (check_heading_levels, list_headings))
+def test_staged_from_subdirectory(repo, monkeypatch, hook):
+    (repo / "sub").mkdir()
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_markdown_cell("# Title")]
+    nbformat.write(nb, repo / "sub" / "nb0.ipynb")
+    nbformat.write(nb, repo / "nb1.ipynb")
+    subprocess.run(["git", "add", "."], check=True)
+    monkeypatch.chdir(repo / "sub")
+
+    assert sorted(staged_files(suffixes=[".ipynb"])) == ["../nb1.ipynb", "nb0.ipynb"]
+    assert sorted(index_entries()) == [
+        "../a.txt",
+        "../b c.txt",
+        "../d.txt",
+        "../nb1.ipynb",
+        "nb0.ipynb",
+    ]
+
+    result = CliRunner().invoke(hook, ["--staged", "--no-cache"])
+
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+    assert result.exit_code == 0
+
+
+@pytest.mark.parametrize(
+    "hook,exit_code", ((check_heading_levels, 1), (list_headings, 0))
+)
+def test_staged_skips_plain_text(repo, hook, exit_code):
+    (repo / "README.md").write_text("# Readme\n\n### skip\n")
+    (repo / "module.py").write_text("# # Module\n\n# ### skip\n\nx = 1\n")
+    (repo / "paired.py").write_text(
+        "# ---\n# jupyter:\n#   jupytext:\n#     formats: ipynb,py:light\n# ---\n\n"
+        "# # Paired\n\n# ### Too deep\n"
+    )
+    (repo / "percent.py").write_text("# %% [markdown]\n# # Percent\n")
+    subprocess.run(["git", "add", "."], check=True)
+
+    assert sorted(staged_notebooks()) == ["paired.py", "percent.py"]
+
+    result = CliRunner().invoke(hook, ["--staged", "--no-cache"])
+
+    assert result.exit_code == exit_code
+    assert "Paired" in result.output or "paired.py" in result.output
+    assert "skip" not in result.output
+    assert "README" not in result.output
+    assert "module" not in result.output
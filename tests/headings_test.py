@@ -0,0 +1,153 @@
+import json
+
+import nbformat
+import pytest
+
+from heartfelt_hooks.check_heading_levels import DedentValidator
+from heartfelt_hooks.check_heading_levels import IndentValidator
+from heartfelt_hooks.check_heading_levels import NotebookHeadings
+from heartfelt_hooks.check_heading_levels import OneAndOnlyOneLevelOneValidator
+from heartfelt_hooks.check_heading_levels import StartsWithLevelOneValidator
+from heartfelt_hooks.check_heading_levels import _fix_source
+from heartfelt_hooks.check_heading_levels import fix_headings
+from heartfelt_hooks.check_heading_levels import remap_levels
+
+
+@pytest.fixture
+def notebook():
+    cells = []
+    for count in range(50):
+        if count % 3:
+            source = f"# Heading {count}\n\nsome text\n\n## Heading {count}.1"
+            cells.append(nbformat.v4.new_markdown_cell(source))
+        else:
+            cells.append(nbformat.v4.new_code_cell("# not a heading"))
+    cells[4].metadata["tags"] = ["toc"]
+
+    nb = nbformat.v4.new_notebook()
+    nb.cells = cells
+    return nb
+
+
+@pytest.mark.parametrize("jobs", (0, 2, 3))
+def test_extract_sharded(notebook, jobs):
+    expected = NotebookHeadings.extract(notebook, cells_to_ignore=["toc"])
+    actual = NotebookHeadings.extract(
+        notebook, cells_to_ignore=["toc"], jobs=jobs, shard_size=0
+    )
+    assert actual == expected
+
+
+def test_extract_headings_in_order(notebook):
+    headings = NotebookHeadings.extract(notebook, cells_to_ignore=["toc"])
+
+    assert [count for count, _ in headings] == sorted(count for count, _ in headings)
+    assert 4 not in {count for count, _ in headings}
+    assert headings[:2] == [
+        (1, NotebookHeadings._extract_headings_from_source("# Heading 1")[0]),
+        (1, NotebookHeadings._extract_headings_from_source("## Heading 1.1")[0]),
+    ]
+
+
+@pytest.mark.parametrize(
+    "levels,expected",
+    (
+        ([], []),
+        ([1, 2, 3, 2, 1], [1, 2, 3, 2, 1]),
+        ([3, 5, 6, 4], [1, 2, 3, 2]),
+        ([2, 1, 2], [1, 1, 2]),
+    ),
+)
+def test_remap_levels(levels, expected):
+    assert remap_levels(levels) == expected
+
+
+@pytest.mark.parametrize(
+    "levels,expected",
+    (
+        ([6, 1, 2, 3], [6, 1, 2, 3]),
+        ([6, 1, 3, 5], [6, 1, 2, 3]),
+        ([5, 1, 2], [5, 5, 6]),
+        ([4, 1, 2], [4, 4, 5]),
+    ),
+)
+def test_remap_levels_keeps_first(levels, expected):
+    assert remap_levels(levels, first=None) == expected
+
+
+@pytest.mark.parametrize(
+    "rules,expected",
+    (
+        ({}, [2, 4, 1, 3]),
+        ({"first": 1}, [1, 3, 1, 3]),
+        ({"indent": True}, [2, 3, 1, 2]),
+        ({"dedent": True}, [2, 4, 2, 4]),
+        ({"first": 1, "indent": True, "dedent": True}, [1, 2, 1, 2]),
+    ),
+)
+def test_remap_levels_by_rule(rules, expected):
+    options = {"first": None, "indent": False, "dedent": False, **rules}
+    assert remap_levels([2, 4, 1, 3], **options) == expected
+
+
+def test_fix_headings():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_markdown_cell("## Title\n\nSome text"),
+        nbformat.v4.new_code_cell("# not a heading"),
+        nbformat.v4.new_markdown_cell("#### Deep ####\n\n   ## Section\n"),
+        nbformat.v4.new_markdown_cell("# Fine\n"),
+    ]
+    headings = NotebookHeadings.extract(nb)
+
+    fixes = fix_headings(nb, headings)
+
+    assert [(cell, heading.level, level) for cell, heading, level in fixes] == [
+        (0, 2, 1),
+        (2, 4, 2),
+        (2, 2, 1),
+    ]
+    assert [cell.source for cell in nb.cells] == [
+        "# Title\n\nSome text",
+        "# not a heading",
+        "## Deep ####\n\n   # Section\n",
+        "# Fine\n",
+    ]
+
+    validator = IndentValidator(None, headings=NotebookHeadings.extract(nb))
+    assert validator.validate() == 0
+    assert fix_headings(nb, NotebookHeadings.extract(nb)) == []
+
+
+@pytest.mark.parametrize(
+    "validators,expected",
+    (
+        ((), "### Deep\n"),
+        ((DedentValidator, OneAndOnlyOneLevelOneValidator), "### Deep\n"),
+        ((IndentValidator,), "## Deep\n"),
+        ((StartsWithLevelOneValidator,), "### Deep\n"),
+    ),
+)
+def test_fix_source_fixes_enabled_rules(validators, expected):
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_markdown_cell(s) for s in ("# Title", "### Deep\n")]
+
+    _, fixes, text = _fix_source("notebook.ipynb", nbformat.writes(nb), validators)
+
+    cells = nb.cells if text is None else nbformat.reads(text, as_version=4).cells
+    assert cells[1].source == expected
+    assert bool(fixes) == (expected != "### Deep\n")
+
+
+def test_fix_source_keeps_formatting():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_markdown_cell(s) for s in ("# Title", "Ünïcode\n### Deep\n")
+    ]
+    text = json.dumps(nb, indent=2, ensure_ascii=True)
+
+    _, fixes, fixed = _fix_source("notebook.ipynb", text, (IndentValidator,))
+
+    assert fixes
+    assert fixed == text.replace("\\n### Deep", "\\n## Deep")
+    assert fixed != text
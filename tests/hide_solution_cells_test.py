@@ -0,0 +1,196 @@
+import copy
+import hashlib
+
+import nbformat
+import pytest
+
+from heartfelt_hooks.hide_solution_cells import MissingTaggedCellError
+from heartfelt_hooks.hide_solution_cells import _hide_cells
+from heartfelt_hooks.hide_solution_cells import _hide_cells_in_source
+from heartfelt_hooks.hide_solution_cells import _index_tags
+from heartfelt_hooks.hide_solution_cells import _strip_outputs
+from heartfelt_hooks.hide_solution_cells import _strips
+from heartfelt_hooks.hide_solution_cells import _VariantWriter
+
+
+@pytest.fixture
+def notebook():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_markdown_cell("# Exercises\n\nÜbung"),
+        nbformat.v4.new_code_cell("x = 1", metadata={"tags": ["solution"]}),
+        nbformat.v4.new_code_cell("y = 2\nprint(y)", metadata={"tags": ["hint"]}),
+        nbformat.v4.new_code_cell(
+            "z = 3", metadata={"tags": ["solution", "answer"], "trusted": True}
+        ),
+    ]
+    nb.cells[2].outputs = [nbformat.v4.new_output("stream", text="2\n")]
+    return nb
+
+
+def test_index_tags(notebook):
+    index = _index_tags(notebook.cells)
+
+    assert index.cells(["solution"]) == [1, 3]
+    assert index.cells(["answer", "hint"]) == [2, 3]
+    assert index.cells(["missing"]) == []
+
+
+def test_hide_cells(notebook):
+    hidden = _hide_cells(notebook.cells, tags_to_hide={"hint"})
+
+    assert hidden == [notebook.cells[2]]
+    assert notebook.cells[2].cell_type == "markdown"
+    assert "outputs" not in notebook.cells[2]
+
+
+def test_hide_cells_missing_tags(notebook):
+    with pytest.raises(MissingTaggedCellError):
+        _hide_cells(notebook.cells, tags_to_hide={"missing"})
+
+
+@pytest.mark.parametrize("tags", ([], ["solution"], ["hint", "answer"]))
+def test_variant_writer_matches_nbformat(notebook, tags):
+    writer = _VariantWriter(notebook)
+    index = _index_tags(notebook.cells)
+
+    cells = {count: copy.deepcopy(notebook.cells[count]) for count in index.cells(tags)}
+    if cells:
+        _hide_cells(list(cells.values()), tags_to_hide=tags)
+    text = writer.writes(cells)
+
+    expected = copy.deepcopy(notebook)
+    if tags:
+        _hide_cells(expected.cells, tags_to_hide=tags)
+
+    assert text == nbformat.writes(expected)
+
+
+def test_variant_writer_empty_notebook():
+    nb = nbformat.v4.new_notebook()
+    assert _VariantWriter(nb).writes({}) == nbformat.writes(nb)
+
+
+def _note(cell, payload="AAAA"):
+    key = hashlib.sha1(payload.encode()).hexdigest()[:12]
+    return f"<image/png sha1:{key}: removed repeat of the output of cell {cell}>"
+
+
+def _display(data):
+    return nbformat.v4.new_output("display_data", data=data)
+
+
+def test_strip_outputs():
+    nb = nbformat.v4.new_notebook(metadata={"widgets": {"state": {}}})
+    nb.cells = [
+        nbformat.v4.new_code_cell(
+            outputs=[
+                nbformat.v4.new_output("stream", text="x" * 100),
+                _display({"image/png": "AAAA", "text/plain": "<Figure>"}),
+            ]
+        ),
+        nbformat.v4.new_code_cell(
+            outputs=[
+                _display({"image/png": "AAAA"}),
+                _display({"image/png": "B" * 100}),
+                _display({"application/vnd.jupyter.widget-view+json": {"id": 1}}),
+            ]
+        ),
+    ]
+
+    [(_, _, success, text)] = _hide_cells_in_source(
+        "notebook.ipynb",
+        nbformat.writes(nb),
+        strip={"max_size": 50, "widgets": True, "dedupe_images": True},
+    )
+    nb = nbformat.reads(text, as_version=4)
+
+    assert success
+    assert "widgets" not in nb.metadata
+    first, second = nb.cells[0].outputs, nb.cells[1].outputs
+
+    assert first[0].text.startswith("x" * 50)
+    assert "truncated" in first[0].text
+    assert first[1].data == {"image/png": "AAAA", "text/plain": "<Figure>"}
+    assert second == [_display({"text/plain": _note(0)})]
+    nbformat.validate(nb)
+
+
+def test_strip_outputs_does_nothing_by_default(notebook):
+    expected = copy.deepcopy(notebook)
+    _strip_outputs(notebook)
+    assert notebook == expected
+
+
+@pytest.fixture
+def repeated_image():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_code_cell(
+            "plot()",
+            metadata={"tags": ["solution"]},
+            outputs=[_display({"image/png": "AAAA"})],
+        ),
+        nbformat.v4.new_code_cell(
+            "plot()",
+            metadata={"tags": ["hint"]},
+            outputs=[_display({"image/png": "AAAA"})],
+        ),
+        nbformat.v4.new_code_cell("plot()", outputs=[_display({"image/png": "AAAA"})]),
+    ]
+    return nbformat.writes(nb)
+
+
+def _images(text):
+    return [
+        [output.data for output in cell.get("outputs", [])]
+        for cell in nbformat.reads(text, as_version=4).cells
+    ]
+
+
+def test_dedupe_images_after_hiding(repeated_image):
+    [(_, _, success, text)] = _hide_cells_in_source(
+        "notebook.ipynb",
+        repeated_image,
+        tags_to_hide={"solution"},
+        strip={"dedupe_images": True},
+    )
+
+    assert success
+    assert _images(text) == [
+        [],
+        [{"image/png": "AAAA"}],
+        [{"text/plain": _note(1)}],
+    ]
+
+
+def test_dedupe_images_for_each_variant(repeated_image):
+    results = _hide_cells_in_source(
+        "notebook.ipynb",
+        repeated_image,
+        variants={"student": ["solution"], "exam": ["solution", "hint"]},
+        strip={"dedupe_images": True},
+    )
+    texts = {name: text for name, _, _, text in results}
+
+    assert _images(texts["student"]) == [
+        [],
+        [{"image/png": "AAAA"}],
+        [{"text/plain": _note(1)}],
+    ]
+    assert _images(texts["exam"]) == [[], [], [{"image/png": "AAAA"}]]
+
+
+def test_strip_outputs_max_size_zero():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_code_cell(outputs=[_display({"image/png": "AAAA"})]),
+    ]
+    [(_, _, success, text)] = _hide_cells_in_source(
+        "notebook.ipynb", nbformat.writes(nb), strip={"max_size": 0}
+    )
+
+    assert success
+    assert _images(text) == [[]]
+    assert _strips(max_size=0)
+    assert not _strips()
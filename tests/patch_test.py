@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from heartfelt_hooks._patch import patch_sources
+
+
+def _notebook(*sources, **kwds):
+    cells = [{"cell_type": "markdown", "metadata": {}, "source": s} for s in sources]
+    return json.dumps({"metadata": {}, "cells": cells, "nbformat": 4}, **kwds)
+
+
+@pytest.mark.parametrize(
+    "source", ("## Title\n\n#### Deep", ["## Title\n", "\n", "#### Deep"])
+)
+@pytest.mark.parametrize("indent", (None, 1, 4))
+def test_patch_sources(source, indent):
+    text = _notebook("keep", source, indent=indent)
+
+    patched = patch_sources(text, {1: "# Title\n\n## Deep"})
+
+    expected = text.replace("## Title", "# Title").replace("#### Deep", "## Deep")
+    assert patched == expected
+    assert json.loads(patched)["cells"][0]["source"] == "keep"
+
+
+def test_patch_sources_inserts():
+    text = _notebook(["# A\n", "é # B"], ensure_ascii=True)
+
+    patched = patch_sources(text, {0: "## A\né ## B"})
+
+    assert patched == text.replace("# A", "## A").replace(" # B", " ## B")
+
+
+@pytest.mark.parametrize(
+    "text",
+    (
+        _notebook("\\u0023 Title"),
+        '{"worksheets": [{"cells": [{"source": "# Title"}]}]}',
+        "not json",
+    ),
+)
+def test_patch_sources_gives_up(text):
+    assert patch_sources(text, {0: "## Title"}) is None
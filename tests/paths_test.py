@@ -0,0 +1,60 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from heartfelt_hooks._fail_fast import ErrorLimit
+from heartfelt_hooks._paths import basename
+from heartfelt_hooks._paths import check_paths
+from heartfelt_hooks._paths import iter_chunks
+from heartfelt_hooks._paths import stem
+
+
+@pytest.mark.parametrize(
+    "path",
+    (
+        "notebook.ipynb",
+        "lessons/Week 1/intro.ipynb",
+        "lessons/Week 1/",
+        "./lessons//archive.tar.gz",
+        "/abs/.gitignore",
+        "no_suffix",
+        "",
+    ),
+)
+def test_matches_pathlib(path):
+    assert basename(path) == Path(path).name
+    assert stem(path) == Path(path).stem
+
+
+def test_iter_chunks():
+    manifest = io.StringIO("c.ipynb\r\nd.ipynb\ne.ipynb\n")
+
+    chunks = list(iter_chunks(("a.ipynb", "b.ipynb"), file=manifest, chunk_size=2))
+
+    assert chunks == [
+        ["a.ipynb", "b.ipynb"],
+        ["c.ipynb", "d.ipynb"],
+        ["e.ipynb"],
+    ]
+
+
+def test_iter_chunks_empty():
+    assert list(iter_chunks((), file=io.StringIO(""))) == []
+
+
+@pytest.mark.parametrize(
+    "max_errors,expected", ((None, (7, 3)), (1, (2, 1)), (2, (5, 2)), (3, (6, 3)))
+)
+def test_check_paths(capsys, max_errors, expected):
+    chunks = [["a.py", "b b.py", "c.py"], ["d.py", "e e.py"], ["f f.py", "g.py"]]
+
+    checked, error_count = check_paths(
+        chunks, lambda path: " " in path, limit=ErrorLimit(max_errors)
+    )
+
+    assert (checked, error_count) == expected
+    assert (
+        capsys.readouterr().out.split()
+        == ["b", "b.py", "e", "e.py", "f", "f.py"][: 2 * error_count]
+    )
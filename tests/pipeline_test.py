@@ -0,0 +1,43 @@
+import pytest
+
+from heartfelt_hooks._pipeline import imap
+
+
+def _count_lines(filepath, text, profiler=None, offset=0):
+    return len(text.splitlines()) + offset
+
+
+@pytest.fixture
+def filepaths(tmp_path):
+    filepaths = []
+    for count in range(20):
+        filepath = tmp_path / f"file_{count}.txt"
+        filepath.write_text("line\n" * count)
+        filepaths.append(filepath)
+    return filepaths
+
+
+@pytest.mark.parametrize("jobs", (1, 2, 4))
+def test_imap_is_ordered(filepaths, jobs):
+    results = list(imap(filepaths, _count_lines, jobs=jobs, offset=1))
+
+    assert [filepath for filepath, _ in results] == filepaths
+    assert [count for _, count in results] == list(range(1, 21))
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_imap_raises(filepaths, jobs):
+    filepaths.insert(5, filepaths[0].parent / "missing.txt")
+
+    results = imap(filepaths, _count_lines, jobs=jobs)
+    with pytest.raises(FileNotFoundError):
+        for _ in results:
+            pass
+
+
+def test_imap_stops_early(filepaths):
+    results = imap(filepaths, _count_lines, jobs=2, prefetch=2)
+    for filepath, _ in results:
+        if filepath == filepaths[3]:
+            break
+    results.close()
@@ -0,0 +1,114 @@
+import sys
+
+import nbformat
+import pytest
+
+from heartfelt_hooks._config import load_config
+from heartfelt_hooks._plugins import BUILTIN_VALIDATORS
+from heartfelt_hooks._plugins import available_validators
+from heartfelt_hooks._plugins import load_validators
+from heartfelt_hooks._plugins import needs_of
+from heartfelt_hooks._readers import read_notebook
+from heartfelt_hooks.check_heading_levels import IndentValidator
+from heartfelt_hooks.check_heading_levels import validate_filepath
+
+PLUGIN = """\
+from heartfelt_hooks.check_heading_levels import SingleHeadingValidator
+
+
+class MaxHeadingLength(SingleHeadingValidator):
+    rule = "max-heading-length"
+
+    def validate(self):
+        self._errors = [(c, h) for c, h in self._headings if len(h.text) > 10]
+        return len(self._errors)
+
+
+class CountOutputs(SingleHeadingValidator):
+    rule = "count-outputs"
+    needs = frozenset({"cells", "outputs"})
+
+    def validate(self):
+        self.n_outputs = sum(len(c.get("outputs", [])) for c in self._nb.cells)
+        return 0
+"""
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "path", list(sys.path))
+
+    (tmp_path / "rules").mkdir()
+    (tmp_path / "rules" / "heartfelt_test_rules.py").write_text(PLUGIN)
+    (tmp_path / "pyproject.toml").write_text("""\
+[tool.heartfelt-hooks]
+plugin-paths = ["rules"]
+
+[tool.heartfelt-hooks.validators]
+max-heading-length = "heartfelt_test_rules:MaxHeadingLength"
+count-outputs = "heartfelt_test_rules:CountOutputs"
+""")
+    return load_config(tmp_path / "pyproject.toml")
+
+
+@pytest.fixture
+def notebook():
+    code = nbformat.v4.new_code_cell("print('hi')")
+    code.outputs = [nbformat.v4.new_output("stream", text="hi")]
+
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_markdown_cell("# A very long heading\n## Short"), code]
+    return nb
+
+
+def test_available_validators(config):
+    validators = available_validators(config=config)
+
+    assert set(validators) == set(BUILTIN_VALIDATORS) | {
+        "max-heading-length",
+        "count-outputs",
+    }
+    assert "heartfelt_test_rules" not in sys.modules
+
+
+def test_load_validators(config, tmp_path, notebook):
+    validators = load_validators(["indent", "max-heading-length"], config=config)
+
+    assert validators[0] is IndentValidator
+    assert validators[1].rule == "max-heading-length"
+    assert needs_of(validators) == {"headings"}
+
+    filepath = tmp_path / "notebook.ipynb"
+    nbformat.write(notebook, filepath)
+    errors = validate_filepath(filepath, validators=validators)
+    assert [log for log, _ in errors] == [f"{filepath}:level=1(cell=0)"]
+
+
+def test_load_validators_unknown(config):
+    with pytest.raises(ValueError, match="unknown rules: missing"):
+        load_validators(["indent", "missing"], config=config)
+
+
+@pytest.mark.parametrize(
+    "needs,n_outputs", ((("cells",), 0), (("cells", "outputs"), 1))
+)
+def test_read_notebook(notebook, needs, n_outputs):
+    nb = read_notebook(nbformat.writes(notebook), needs=needs)
+
+    assert nb.cells[0].source == notebook.cells[0].source
+    assert len(nb.cells[1].outputs) == n_outputs
+
+
+def test_read_notebook_headings_only(notebook):
+    nb = read_notebook(nbformat.writes(notebook).encode(), needs=("headings",))
+
+    assert isinstance(nb, dict)
+    assert nb["cells"][0]["source"] == notebook.cells[0].source
+
+
+def test_validator_needs_outputs(config, notebook):
+    [validator] = load_validators(["count-outputs"], config=config)
+
+    instance = validator("notebook.ipynb", nb=notebook)
+    instance.validate()
+    assert instance.n_outputs == 1
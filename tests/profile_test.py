@@ -0,0 +1,99 @@
+import json
+import pstats
+import time
+
+import pytest
+
+from heartfelt_hooks._profile import NullProfiler
+from heartfelt_hooks._profile import Profiler
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler()
+    with profiler.phase("a.ipynb", "read"):
+        pass
+    profiler.add("a.ipynb", "parse", 0.5)
+    profiler.add("a.ipynb", "parse", 0.25)
+    profiler.add("b.ipynb", "parse", 1.0)
+    return profiler
+
+
+@pytest.mark.parametrize(
+    "profile,profile_output,expected",
+    ((False, None, NullProfiler), (True, None, Profiler), (False, "t.json", Profiler)),
+)
+def test_from_options(profile, profile_output, expected):
+    assert type(Profiler.from_options(profile, profile_output)) is expected
+
+
+def test_add_merges_phases(profiler):
+    timings = profiler.timings
+
+    assert sorted(timings) == ["a.ipynb", "b.ipynb"]
+    assert timings["a.ipynb"]["parse"] == pytest.approx(0.75)
+    assert timings["b.ipynb"] == {"parse": pytest.approx(1.0)}
+    assert timings["a.ipynb"]["read"] >= 0.0
+
+
+def test_to_dict(profiler):
+    timings = profiler.to_dict()
+
+    assert sorted(timings) == ["files", "import", "wall"]
+    assert timings["files"] == profiler.timings
+    assert timings["import"] > 0.0
+    assert timings["wall"] > 0.0
+    assert json.loads(json.dumps(timings)) == timings
+
+
+def test_import_uses_perf_counter(monkeypatch):
+    monkeypatch.setattr(
+        "heartfelt_hooks._profile._IMPORT_STARTED", time.perf_counter() - 2.0
+    )
+    assert Profiler().to_dict()["import"] == pytest.approx(2.0, abs=0.5)
+
+
+def test_to_speedscope(profiler):
+    speedscope = profiler.to_speedscope()
+
+    frames = [frame["name"] for frame in speedscope["shared"]["frames"]]
+    assert frames == ["a.ipynb", "read", "parse", "b.ipynb"]
+
+    [profile] = speedscope["profiles"]
+    assert profile["type"] == "sampled"
+    assert profile["samples"] == [[0, 1], [0, 2], [0, 2], [3, 2]]
+    assert profile["weights"][1:] == pytest.approx([0.5, 0.25, 1.0])
+    assert profile["endValue"] == pytest.approx(sum(profile["weights"]))
+
+
+def test_report_json(tmp_path):
+    dest = tmp_path / "timings.json"
+    with Profiler(dest) as profiler:
+        profiler.add("a.ipynb", "parse", 0.5)
+
+    assert json.loads(dest.read_text())["files"] == {"a.ipynb": {"parse": 0.5}}
+
+
+def test_report_speedscope(tmp_path):
+    dest = tmp_path / "timings.speedscope.json"
+    with Profiler(dest) as profiler:
+        profiler.add("a.ipynb", "parse", 0.5)
+
+    assert json.loads(dest.read_text())["profiles"][0]["weights"] == [0.5]
+
+
+def test_report_cprofile(tmp_path):
+    dest = tmp_path / "timings.prof"
+    with Profiler(dest):
+        assert sorted(range(3, 0, -1)) == [1, 2, 3]
+
+    assert pstats.Stats(str(dest)).total_calls > 0
+
+
+def test_report_summary(profiler, capsys):
+    profiler.report()
+
+    err = capsys.readouterr().err
+    assert "Time by phase" in err
+    assert "Slowest 2 of 2 files" in err
+    assert "wall time:" in err
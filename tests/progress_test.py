@@ -0,0 +1,35 @@
+import io
+
+from rich.console import Console
+
+from heartfelt_hooks._pipeline import imap
+from heartfelt_hooks._progress import NullProgress
+from heartfelt_hooks._progress import Progress
+
+
+def _length(filepath, text, profiler=None):
+    return len(text)
+
+
+def test_from_options():
+    assert isinstance(Progress.from_options(silent=True), NullProgress)
+
+
+def test_progress(tmp_path):
+    filepaths = []
+    for count in range(10):
+        filepaths.append(tmp_path / f"file_{count}.txt")
+        filepaths[-1].write_text("x" * count)
+
+    output = io.StringIO()
+    console = Console(file=output, force_terminal=True, width=120)
+    with Progress(total=12, console=console, interval=0.01) as progress:
+        results = list(progress.track(imap(filepaths, _length, progress=progress)))
+        progress.advance(2)
+        progress._update()
+
+        assert progress._count == 12
+        assert progress._in_flight == {}
+
+    assert [length for _, length in results] == list(range(10))
+    assert "12/12" in output.getvalue()
@@ -0,0 +1,264 @@
+import nbformat
+import pytest
+
+from heartfelt_hooks._cache import ParseStore
+from heartfelt_hooks._plugins import reader_for
+from heartfelt_hooks._readers import read_light
+from heartfelt_hooks._readers import read_markdown
+from heartfelt_hooks._readers import read_myst
+from heartfelt_hooks._readers import read_percent
+from heartfelt_hooks._readers import read_script
+from heartfelt_hooks._readers import read_source
+from heartfelt_hooks.check_heading_levels import NotebookHeadings
+from heartfelt_hooks.check_heading_levels import _store_key
+from heartfelt_hooks.check_heading_levels import cached_headings
+
+PERCENT = """\
+# ---
+# jupyter:
+#   jupytext:
+#     formats: ipynb,py:percent
+# ---
+
+# %% [markdown]
+# # Title
+#
+# ## Section
+
+# %%
+# # a comment, not a heading
+x = 1
+
+# %% [markdown] tags=["toc"]
+# # Contents
+
+# %% [md]
+# ### Subsection
+"""
+
+LIGHT = """\
+# ---
+# jupyter:
+#   jupytext:
+#     formats: ipynb,py:light
+# ---
+
+# # Title
+#
+# ## Section
+
+# # a comment, not a heading
+x = 1
+
+# + [markdown] tags=["toc"]
+# # Contents
+# -
+
+# +
+def f():
+    # # in a code cell
+
+    return 1
+# -
+
+# ### Subsection
+"""
+
+MARKDOWN = """\
+---
+jupyter:
+  kernelspec:
+    name: python3
+---
+
+# Title
+
+```python
+# a comment, not a heading
+```
+
+```
+# in a plain code block
+```
+
+<!-- #region tags=["toc"] -->
+# Contents
+<!-- #endregion -->
+
+## Section
+"""
+
+MYST = """\
+---
+jupytext:
+  text_representation:
+    format_name: myst
+---
+
+# Title
+
+```{code-cell} ipython3
+:tags: [hide-input]
+# a comment, not a heading
+```
+
++++ {"tags": ["toc"]}
+
+# Contents
+
++++
+
+## Section
+"""
+
+
+def _headings(nb, cells_to_ignore=None):
+    return [
+        (cell, heading.level, heading.text)
+        for cell, heading in NotebookHeadings.extract(
+            nb, cells_to_ignore=cells_to_ignore
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "reader,source,expected",
+    (
+        (
+            read_percent,
+            PERCENT,
+            [(0, 1, "Title"), (0, 2, "Section"), (3, 3, "Subsection")],
+        ),
+        (read_light, LIGHT, [(0, 1, "Title"), (0, 2, "Section"), (4, 3, "Subsection")]),
+        (read_markdown, MARKDOWN, [(0, 1, "Title"), (4, 2, "Section")]),
+        (read_myst, MYST, [(0, 1, "Title"), (3, 2, "Section")]),
+    ),
+)
+def test_reader_headings(reader, source, expected):
+    assert _headings(reader(source), cells_to_ignore=["toc"]) == expected
+
+
+@pytest.mark.parametrize(
+    "reader,source,cell",
+    (
+        (read_percent, PERCENT, 2),
+        (read_light, LIGHT, 2),
+        (read_markdown, MARKDOWN, 3),
+        (read_myst, MYST, 2),
+    ),
+)
+def test_reader_keeps_tags(reader, source, cell):
+    assert reader(source)["cells"][cell]["metadata"]["tags"] == ["toc"]
+    assert (cell, 1, "Contents") in _headings(reader(source))
+
+
+def test_markdown_detects_myst():
+    assert read_markdown(MYST) == read_myst(MYST)
+
+
+def test_script_detects_format():
+    assert read_script(PERCENT) == read_percent(PERCENT)
+    assert read_script(LIGHT) == read_light(LIGHT)
+    assert read_script("# # Title\n") == read_light("# # Title\n")
+    assert read_script(PERCENT.encode()) == read_percent(PERCENT)
+
+
+@pytest.mark.parametrize(
+    "reader,source",
+    (
+        (read_markdown, "---\ntitle: Title\n---\n# Title\n"),
+        (read_percent, "# ---\n# title: Title\n# ---\n# %% [md]\n# # Title\n"),
+    ),
+)
+def test_front_matter_is_not_a_heading(reader, source):
+    assert _headings(reader(source)) == [(0, 1, "Title")]
+
+
+@pytest.mark.parametrize("needs", ({"headings"}, {"headings", "cells"}))
+def test_reader_needs(needs):
+    nb = read_percent(PERCENT, needs=needs)
+    assert isinstance(nb, nbformat.NotebookNode) == ("cells" in needs)
+
+
+@pytest.mark.parametrize(
+    "filepath,expected",
+    (
+        ("notebook.ipynb", "read_notebook"),
+        ("notebook.py", "read_script"),
+        ("notebook.MD", "read_markdown"),
+        ("notebook.myst", "read_myst"),
+        ("notebook", "read_notebook"),
+        ("notebook.json", "read_notebook"),
+    ),
+)
+def test_reader_for(filepath, expected):
+    assert reader_for(filepath, config={}).__name__ == expected
+
+
+def test_cached_headings_by_format(tmp_path):
+    store = ParseStore(tmp_path)
+
+    md = cached_headings("# Title\n", store=store, filepath="notebook.md")
+    py = cached_headings("# Title\n", store=store, filepath="notebook.py")
+
+    assert [heading.text for _, heading in md] == ["Title"]
+    assert py == []
+
+
+def test_read_source_defaults_to_ipynb():
+    nb = nbformat.v4.new_notebook(cells=[nbformat.v4.new_markdown_cell("# Title")])
+    assert read_source(nbformat.writes(nb))["cells"][0]["source"] == "# Title"
+
+
+def test_store_key_follows_reader(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert _store_key("abcdef", "notebook.ipynb") == "abcdef"
+    key = _store_key("abcdef", "notebook.md")
+    assert key.startswith("abcdef-")
+
+    # pyproject.toml is only looked for once per directory
+    (tmp_path / "configured").mkdir()
+    monkeypatch.chdir(tmp_path / "configured")
+    (tmp_path / "configured" / "pyproject.toml").write_text(
+        '[tool.heartfelt-hooks.readers]\n".md" = "heartfelt_hooks._readers:read_myst"\n'
+    )
+    assert _store_key("abcdef", "notebook.md") not in ("abcdef", key)
+
+
+def test_percent_multiple_tags():
+    nb = read_percent(
+        '# %% [markdown] tags=["toc", "other"]\n# # Contents\n\n'
+        "# %% [markdown]\n# # Title\n"
+    )
+
+    assert nb["cells"][0]["metadata"] == {"tags": ["toc", "other"]}
+    assert _headings(nb, cells_to_ignore=["toc"]) == [(1, 1, "Title")]
+
+
+def test_markdown_region_multiple_tags():
+    nb = read_markdown(
+        '<!-- #region tags=["toc", "other"] -->\n# Contents\n<!-- #endregion -->\n'
+        "\n# Title\n"
+    )
+
+    assert nb["cells"][0]["metadata"] == {"tags": ["toc", "other"]}
+    assert _headings(nb, cells_to_ignore=["toc"]) == [(1, 1, "Title")]
+
+
+@pytest.mark.parametrize(
+    "marker,cell_type,metadata",
+    (
+        ("# %% Introduction [markdown]", "markdown", {}),
+        ('# %% A title [md] tags=["toc"]', "markdown", {"tags": ["toc"]}),
+        ("# %% [raw]", "raw", {}),
+        ("# %% Plot the [data]", "code", {}),
+        ("# %% Setup", "code", {}),
+        ('# %% tags=["parameters"]', "code", {"tags": ["parameters"]}),
+    ),
+)
+def test_percent_markers(marker, cell_type, metadata):
+    [cell] = read_percent(f"{marker}\n# # Heading\n")["cells"]
+
+    assert cell["cell_type"] == cell_type
+    assert cell["metadata"] == metadata
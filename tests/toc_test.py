@@ -0,0 +1,102 @@
+import nbformat
+import pytest
+
+from heartfelt_hooks._toc import render_toc
+from heartfelt_hooks._toc import slugify
+from heartfelt_hooks.check_heading_levels import NotebookHeadings
+from heartfelt_hooks.list_headings import _insert_toc_in_source
+from heartfelt_hooks.list_headings import _list_headings_in_source
+
+SOURCES = (
+    "# Table of Contents",
+    "## Intro\n\n### Setup\n\n#### Detail",
+    "## Usage\n\n### Setup",
+)
+
+
+@pytest.fixture
+def notebook():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_markdown_cell(source) for source in SOURCES]
+    nb.cells[0].metadata["tags"] = ["toc"]
+    return nb
+
+
+@pytest.mark.parametrize(
+    "max_depth,expected",
+    (
+        (None, ["Intro", "Setup", "Detail", "Usage", "Setup"]),
+        (3, ["Intro", "Setup", "Detail", "Usage", "Setup"]),
+        (2, ["Intro", "Setup", "Usage", "Setup"]),
+        (1, ["Intro", "Usage"]),
+    ),
+)
+def test_toc_max_depth(notebook, max_depth, expected):
+    headings = NotebookHeadings("notebook.ipynb", cells_to_ignore=["toc"], nb=notebook)
+    toc = headings.toc(max_depth=max_depth)
+
+    assert [line.split("]")[0].split("[")[1] for line in toc.splitlines()] == expected
+
+
+def test_toc_keeps_anchors_of_hidden_headings(notebook):
+    headings = NotebookHeadings("notebook.ipynb", cells_to_ignore=["toc"], nb=notebook)
+
+    assert headings.toc(max_depth=2).splitlines() == [
+        "* [Intro](#Intro)",
+        "  * [Setup](#Setup)",
+        "* [Usage](#Usage)",
+        "  * [Setup](#Setup-1)",
+    ]
+    assert str(headings) == headings.toc()
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    (
+        ("What's new?", "What's-new?"),
+        ("The `run` command", "The-run-command"),
+        ("A **bold** _move_", "A-bold-move"),
+        ("See [the docs](https://example.org) now", "See-the-docs-now"),
+        ("Plot ![a logo](logo.png)", "Plot-"),
+    ),
+)
+def test_slugify_strips_inline_markup(text, expected):
+    assert slugify(text) == expected
+
+
+def test_toc_of_headings_with_markup():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_markdown_cell("# The `run` command\n## **Bold** move")]
+
+    assert NotebookHeadings("notebook.ipynb", nb=nb).toc().splitlines() == [
+        "* [The `run` command](#The-run-command)",
+        "  * [**Bold** move](#Bold-move)",
+    ]
+
+
+def test_toc_is_indented_from_the_shallowest_heading():
+    assert render_toc([(3, "Deep"), (2, "Shallow")]).splitlines() == [
+        "  * [Deep](#Deep)",
+        "* [Shallow](#Shallow)",
+    ]
+    assert render_toc([]) == ""
+
+
+def test_list_headings_max_depth(notebook):
+    toc = _list_headings_in_source(
+        "notebook.ipynb", nbformat.writes(notebook), max_depth=1
+    )
+    assert toc.splitlines() == ["* [Intro](#Intro)", "* [Usage](#Usage)"]
+
+
+def test_insert_toc_max_depth(notebook):
+    _, _, text = _insert_toc_in_source(
+        "notebook.ipynb", nbformat.writes(notebook), max_depth=1
+    )
+    toc = nbformat.reads(text, as_version=4).cells[0].source
+
+    assert toc.splitlines() == [
+        "# Table of Contents",
+        "* [Intro](#Intro)",
+        "* [Usage](#Usage)",
+    ]